@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+下载性能测试脚本，在本地HTTP服务器上测量每个文件的下载开销
+
+同时启动HTTP/1.1服务器和HTTP/2（h2c）服务器，比较下载引擎使用HTTP/1.1连接池
+和HTTP/2多路复用时的表现。未安装h2时跳过HTTP/2测试。
+
+用法:
+    python bench_download.py [文件数量] [文件大小(字节)]
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+# 设置基础路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from PyQt5.QtCore import QCoreApplication
+
+from src.utils.api_client import DownloadTask
+from src.utils.download_engine import AsyncDownloadEngine
+from src.utils.install_plan import DownloadItem
+
+class BenchHandler(BaseHTTPRequestHandler):
+    """
+    返回固定大小内容的HTTP处理器
+    """
+    protocol_version = "HTTP/1.1"
+    # 响应头和内容分两次写入，需要关闭Nagle算法以免长连接上出现延迟确认
+    disable_nagle_algorithm = True
+    payload = b""
+    # 已建立的连接数
+    connections = 0
+    
+    def setup(self):
+        BenchHandler.connections += 1
+        super().setup()
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_server(payload):
+    """
+    在后台线程中启动本地HTTP服务器
+    
+    Args:
+        payload (bytes): 每个请求返回的内容
+    
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: 服务器实例和基础URL
+    """
+    BenchHandler.payload = payload
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BenchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+class H2Protocol(asyncio.Protocol):
+    """
+    返回固定大小内容的HTTP/2（h2c）服务器连接
+    """
+    payload = b""
+    # 已建立的连接数
+    connections = 0
+    
+    def __init__(self):
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        self.transport = None
+        # 因流量控制窗口不足而尚未发送完的响应数据
+        self.pending = {}
+    
+    def connection_made(self, transport):
+        H2Protocol.connections += 1
+        self.transport = transport
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+    
+    def data_received(self, data):
+        try:
+            events = self.conn.receive_data(data)
+        except Exception:
+            self.transport.close()
+            return
+        
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                self.conn.send_headers(event.stream_id, [
+                    (":status", "200"),
+                    ("content-length", str(len(self.payload)))
+                ])
+                self.pending[event.stream_id] = self.payload
+            elif isinstance(event, h2.events.StreamReset):
+                self.pending.pop(event.stream_id, None)
+        
+        self.send_pending()
+        self.transport.write(self.conn.data_to_send())
+    
+    def send_pending(self):
+        """
+        在流量控制窗口允许的范围内发送待发送的响应数据
+        """
+        for stream_id in list(self.pending):
+            data = self.pending[stream_id]
+            while data:
+                size = min(len(data), self.conn.local_flow_control_window(stream_id),
+                           self.conn.max_outbound_frame_size)
+                if size <= 0:
+                    break
+                self.conn.send_data(stream_id, data[:size])
+                data = data[size:]
+            
+            if data:
+                self.pending[stream_id] = data
+            else:
+                self.conn.end_stream(stream_id)
+                del self.pending[stream_id]
+
+def start_h2_server(payload):
+    """
+    在后台线程中启动本地HTTP/2（h2c）服务器
+    
+    Args:
+        payload (bytes): 每个请求返回的内容
+    
+    Returns:
+        Tuple[asyncio.AbstractEventLoop, str]: 服务器事件循环和基础URL
+    """
+    H2Protocol.payload = payload
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(loop.create_server(H2Protocol, "127.0.0.1", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+def bench_download_task(base_url, dest_dir, count):
+    """
+    逐个使用DownloadTask下载文件
+    
+    Returns:
+        float: 总耗时（秒）
+    """
+    start = time.perf_counter()
+    for i in range(count):
+        task = DownloadTask(f"task_{i}", f"{base_url}/task/{i}", os.path.join(dest_dir, "task", str(i)))
+        task.start()
+        task.wait()
+    return time.perf_counter() - start
+
+def bench_engine(base_url, dest_dir, count, concurrency, http2=False):
+    """
+    使用asyncio下载引擎下载文件
+    
+    Args:
+        http2 (bool): 是否使用HTTP/2（h2c）
+    
+    Returns:
+        Tuple[float, int]: 总耗时（秒）和服务器收到的连接数
+    """
+    server_class = H2Protocol if http2 else BenchHandler
+    connections = server_class.connections
+    name = f"{'h2' if http2 else 'h1'}_{concurrency}"
+    items = [
+        DownloadItem(f"engine_{i}", f"{base_url}/engine/{i}", os.path.join(dest_dir, "engine", name, str(i)))
+        for i in range(count)
+    ]
+    engine = AsyncDownloadEngine(max_concurrency=concurrency, per_host_limit=concurrency,
+                                 http2=http2, http1=not http2)
+    start = time.perf_counter()
+    engine.run(items)
+    return time.perf_counter() - start, server_class.connections - connections
+
+def report(name, elapsed, count, connections=None):
+    line = f"{name:<36} 总耗时 {elapsed:8.3f}s  每个文件 {elapsed / count * 1000:8.2f}ms"
+    if connections is not None:
+        line += f"  连接数 {connections}"
+    print(line)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    
+    app = QCoreApplication(sys.argv)
+    payload = os.urandom(size)
+    server, base_url = start_server(payload)
+    h2_loop, h2_base_url = start_h2_server(payload) if h2 is not None else (None, None)
+    dest_dir = tempfile.mkdtemp(prefix="tmcl-bench-")
+    print(f"本地服务器: {base_url}  文件数量: {count}  文件大小: {size}字节")
+    
+    try:
+        report("DownloadTask (串行)", bench_download_task(base_url, dest_dir, count), count)
+        if AsyncDownloadEngine.is_available():
+            for concurrency in (1, 16, 64):
+                elapsed, connections = bench_engine(base_url, dest_dir, count, concurrency)
+                report(f"AsyncDownloadEngine ({concurrency}并发)", elapsed, count, connections)
+        else:
+            print("未安装httpx，跳过AsyncDownloadEngine测试")
+        
+        if AsyncDownloadEngine.is_http2_available() and h2_loop is not None:
+            print(f"HTTP/2服务器: {h2_base_url}")
+            for concurrency in (1, 16, 64):
+                elapsed, connections = bench_engine(h2_base_url, dest_dir, count, concurrency, True)
+                report(f"AsyncDownloadEngine HTTP/2 ({concurrency}并发)", elapsed, count, connections)
+        else:
+            print("未安装h2，跳过HTTP/2测试")
+    finally:
+        server.shutdown()
+        if h2_loop is not None:
+            h2_loop.call_soon_threadsafe(h2_loop.stop)
+        shutil.rmtree(dest_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+镜像选择检查脚本，在本地HTTP服务器上模拟较慢的镜像和出错的镜像
+
+检查测速时最快的镜像被选为首选镜像，以及首选镜像连续返回503达到
+MirrorRegistry.FAILOVER_THRESHOLD次后切换到其他镜像。
+
+用法:
+    python check_mirrors.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 设置基础路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from src.utils.api_client import BMCLAPIClient
+from src.utils.mirrors import Mirror, MirrorRegistry
+from src.utils.retry import RetryPolicy
+
+# 官方地址前缀，各镜像将其映射到本地服务器的不同路径
+OFFICIAL_BASE = "https://files.example.com/"
+
+# 较慢镜像的响应延迟（秒）
+SLOW_DELAY = 0.5
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """
+    /slow/下的请求延迟返回；/flaky/下的请求在failing为True时返回503，否则立即返回
+    """
+    protocol_version = "HTTP/1.1"
+    payload = b"mirror check payload"
+    failing = False
+    
+    def do_GET(self):
+        if self.path.startswith("/slow/"):
+            time.sleep(SLOW_DELAY)
+        elif self.path.startswith("/flaky/") and self.failing:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    """
+    在后台线程中启动本地HTTP服务器
+    
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: 服务器实例和基础URL
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MirrorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def check(name, passed, detail=""):
+    print(f"{'通过' if passed else '失败'}  {name}  {detail}")
+    return passed
+
+def main():
+    server, base_url = start_server()
+    dest_dir = tempfile.mkdtemp(prefix="tmcl-check-")
+    results = []
+    try:
+        slow = Mirror("slow", {OFFICIAL_BASE: f"{base_url}/slow/"})
+        flaky = Mirror("flaky", {OFFICIAL_BASE: f"{base_url}/flaky/"})
+        registry = MirrorRegistry([slow, flaky], probe_url=OFFICIAL_BASE + "probe", probe_timeout=5)
+        
+        # 测速：最先返回数据的镜像成为首选镜像
+        winner = registry.probe()
+        results.append(check("测速选出最快的镜像", winner is flaky, f"首选镜像: {winner}"))
+        
+        # 首选镜像开始返回503，每次下载都从较慢的镜像完成，直到达到切换阈值
+        client = BMCLAPIClient(cache_dir=os.path.join(dest_dir, "cache"), mirrors=registry)
+        client.retry_policy = RetryPolicy(max_attempts=1)
+        MirrorHandler.failing = True
+        order = []
+        for i in range(MirrorRegistry.FAILOVER_THRESHOLD + 1):
+            order.append(registry.candidate_urls(f"{OFFICIAL_BASE}file{i}")[0][0].name)
+            if not client.download_file(f"{OFFICIAL_BASE}file{i}", os.path.join(dest_dir, f"file{i}")):
+                results.append(check(f"第{i + 1}次下载由其他镜像完成", False))
+        
+        expected = ["flaky"] * MirrorRegistry.FAILOVER_THRESHOLD + ["slow"]
+        results.append(check(f"连续失败{MirrorRegistry.FAILOVER_THRESHOLD}次后切换镜像", order == expected,
+                             f"每次下载的首选镜像: {order}"))
+        results.append(check("切换后首选镜像为slow", registry.preferred is slow, str(registry.get_health())))
+    finally:
+        server.shutdown()
+        shutil.rmtree(dest_dir, ignore_errors=True)
+    
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+下载调度检查脚本，在本地HTTP服务器上验证多个安装任务共享下载队列时的调度
+
+第一个任务下载一个传输较慢的大文件，下载过程中加入第二个任务的小文件，
+第二个任务应当立即开始下载，而不是等到大文件下载完成。
+
+用法:
+    python check_scheduler.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 设置基础路径
+base_dir = os.path.dirname(os.path.abspath(__file__))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from PyQt5.QtCore import QCoreApplication
+
+from src.utils.api_client import BMCLAPIClient, VersionDownloadManager
+from src.utils.download_engine import AsyncDownloadEngine
+from src.utils.install_plan import DownloadItem
+from src.utils.mirrors import Mirror, MirrorRegistry
+
+# 大文件的大小和传输耗时（秒）
+LARGE_SIZE = 2 * 1024 * 1024
+LARGE_DURATION = 3.0
+
+# 开始下载大文件后多久加入第二个任务（秒）
+SECOND_JOB_DELAY = 0.5
+
+class SchedulerHandler(BaseHTTPRequestHandler):
+    """
+    /large/下的文件分块慢速返回，其他文件立即返回，并记录每个请求到达的时间
+    """
+    protocol_version = "HTTP/1.1"
+    files = {}
+    arrivals = {}
+    
+    def do_GET(self):
+        SchedulerHandler.arrivals.setdefault(self.path, time.monotonic())
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not self.path.startswith("/large/"):
+            self.wfile.write(body)
+            return
+        
+        chunks = 30
+        chunk_size = len(body) // chunks + 1
+        for offset in range(0, len(body), chunk_size):
+            self.wfile.write(body[offset:offset + chunk_size])
+            self.wfile.flush()
+            time.sleep(LARGE_DURATION / chunks)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    """
+    在后台线程中启动本地HTTP服务器
+    
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: 服务器实例和基础URL
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SchedulerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def make_item(base_url, dest_dir, path, body, kind):
+    """
+    注册服务器上的文件并创建对应的下载项
+    """
+    SchedulerHandler.files[path] = body
+    return DownloadItem(path, base_url + path, os.path.join(dest_dir, path.strip("/")),
+                        hashlib.sha1(body).hexdigest(), len(body), kind)
+
+def check_second_job_starts(app, base_url, dest_dir):
+    """
+    第一个任务的大文件下载期间加入第二个任务，检查第二个任务的文件是否立即开始下载
+    
+    Returns:
+        bool: 检查是否通过
+    """
+    client = BMCLAPIClient(cache_dir=os.path.join(dest_dir, "cache"), mirrors=MirrorRegistry([Mirror("local")]))
+    manager = VersionDownloadManager(client)
+    results = {}
+    
+    large = make_item(base_url, dest_dir, "/large/client.jar", os.urandom(LARGE_SIZE), "client")
+    small = [make_item(base_url, dest_dir, f"/small/{i}", os.urandom(4096), "asset") for i in range(5)]
+    
+    start = time.monotonic()
+    manager._start_downloads([large], lambda ok, msg: results.__setitem__("A", ok), "A")
+    second_job_added = False
+    while len(results) < 2 and time.monotonic() - start < LARGE_DURATION * 4:
+        if not second_job_added and time.monotonic() - start >= SECOND_JOB_DELAY:
+            manager._start_downloads(small, lambda ok, msg: results.__setitem__("B", ok), "B")
+            second_job_added = True
+        app.processEvents()
+        time.sleep(0.01)
+    
+    arrivals = SchedulerHandler.arrivals
+    first_small = min((arrivals[item.task_id] for item in small if item.task_id in arrivals), default=None)
+    delay = None if first_small is None else first_small - start
+    print(f"任务结果: {results}")
+    print(f"第二个任务的第一个请求在{delay:.2f}s到达" if delay is not None else "第二个任务没有发出请求")
+    
+    # 第二个任务应在加入后很快开始，远早于大文件传输完成
+    return results == {"A": True, "B": True} and delay is not None and delay < SECOND_JOB_DELAY + 1.0
+
+def main():
+    if not AsyncDownloadEngine.is_available():
+        print("未安装httpx，跳过检查")
+        return
+    
+    app = QCoreApplication(sys.argv)
+    server, base_url = start_server()
+    dest_dir = tempfile.mkdtemp(prefix="tmcl-check-")
+    try:
+        ok = check_second_job_starts(app, base_url, dest_dir)
+    finally:
+        server.shutdown()
+        shutil.rmtree(dest_dir, ignore_errors=True)
+    
+    print("通过" if ok else "失败")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -29,7 +29,7 @@ os.environ['QT_FONT_DPI'] = '96'
 from src.core.config_manager import ConfigManager
 from src.core.version_manager import VersionManager
 from src.core.game_launcher import GameLauncher
-from src.utils.api_client import BMCLAPIClient
+from src.utils.api_client import bmcl_api_client
 from src.utils.logger import LoggerManager
 
 # 导入UI组件
@@ -69,7 +69,8 @@ def main():
         # 创建核心组件实例
         config_manager = ConfigManager()
         version_manager = VersionManager(config_manager)
-        bmcl_api = BMCLAPIClient()
+        # 与版本下载管理器共用全局API客户端，版本清单和校验缓存只有一份
+        bmcl_api = bmcl_api_client
         
         # 创建预加载线程
         preload_thread = PreloadThread(config_manager, version_manager, bmcl_api)
@@ -4,12 +4,28 @@
 import requests
 import json
 import os
-from typing import Dict, List, Optional, Tuple
-from PyQt5.QtCore import QThread, pyqtSignal, QUrl
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from PyQt5.QtCore import QThread, pyqtSignal, QStandardPaths
 import threading
 import time
 from ..utils.logger import logger
+from ..utils.utils import Utils
+from ..utils.install_plan import DownloadItem, InstallPlan
+from ..utils.download_engine import AsyncDownloadEngine
+from ..utils.partial_download import PartialDownload
+from ..utils.verify_cache import FileVerifyCache
+from ..utils.natives import NativesCache
+from ..utils.rules import PlatformContext, RulesEngine
+from ..utils.mirrors import MirrorRegistry
+from ..utils.concurrency import AdaptiveConcurrency
+from ..utils.download_queue import DownloadQueue
+from ..utils.download_job import DownloadJob
+from ..utils.inflight import InFlightRegistry
+from ..utils.download_progress import DownloadProgress
+from ..utils.retry import RetryPolicy
+from ..utils.bandwidth import BandwidthLimiter
+from ..utils.buffers import buffer_pool
 
 class BMCLAPIClient:
     """
@@ -19,406 +35,1781 @@ class BMCLAPIClient:
     # BMCL API基础URL
     API_BASE_URL = "https://bmclapi2.bangbang93.com"
     
-    def __init__(self):
+    # 官方版本清单地址，v2清单中每个版本条目带有版本JSON的sha1
+    MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+    
+    # HTTP连接池大小，后台下载线程共用同一个会话
+    HTTP_POOL_SIZE = 64
+    
+    # 版本清单缓存有效期（秒），有效期内直接使用磁盘缓存，不发起网络请求
+    MANIFEST_CACHE_TTL = 10 * 60
+    
+    # 重新验证过期的版本清单失败后，在该时间（秒）内直接使用本地缓存，避免离线时每次调用都等待网络超时
+    MANIFEST_RETRY_BACKOFF = 60
+    
+    # 版本清单缓存文件名
+    MANIFEST_CACHE_FILE = "version_manifest.json"
+    MANIFEST_META_FILE = "version_manifest.meta.json"
+    
+    # 版本JSON缓存哈希索引文件名
+    VERSION_HASH_INDEX_FILE = "version_hashes.json"
+    
+    # 文件校验缓存数据库文件名
+    VERIFY_CACHE_FILE = "file_verify.sqlite3"
+    
+    # 官方下载地址到BMCL API地址的映射
+    MIRROR_URL_MAP = {
+        "https://launchermeta.mojang.com": "",
+        "https://launcher.mojang.com": "",
+        "https://piston-meta.mojang.com": "",
+        "https://piston-data.mojang.com": "",
+        "https://libraries.minecraft.net": "/maven",
+        "https://resources.download.minecraft.net": "/assets"
+    }
+    
+    def __init__(self, cache_dir: Optional[str] = None, manifest_ttl: Optional[int] = None,
+                 mirrors: Optional[MirrorRegistry] = None):
         """
         初始化API客户端
+        
+        Args:
+            cache_dir (Optional[str]): 缓存目录，默认为启动器数据目录下的cache
+            manifest_ttl (Optional[int]): 版本清单缓存有效期（秒），默认为MANIFEST_CACHE_TTL
+            mirrors (Optional[MirrorRegistry]): 镜像注册表，默认为BMCLAPI和官方源
+        """
+        self.session = requests.Session()
+        self.headers = {
+            "User-Agent": "TMCL Launcher",
+            "Accept": "application/json"
+        }
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=self.HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # 正在进行的下载，同一文件的重复请求合并为一次传输
+        self.inflight = InFlightRegistry()
+        
+        # 所有下载路径共用的重试策略，只重试超时、连接中断、5xx和429等临时性错误
+        self.retry_policy = RetryPolicy()
+        
+        # 所有下载路径共用的带宽限制，支持全局、单个下载任务和游戏运行时限速
+        self.bandwidth = BandwidthLimiter()
+        
+        # 下载镜像，首次联网时测速选择，失败时自动切换
+        self.mirrors = mirrors or MirrorRegistry.default(self.API_BASE_URL, self.MIRROR_URL_MAP, self.MANIFEST_URL)
+        
+        # 缓存目录在首次使用时确定：全局实例在模块导入时创建，此时应用程序名称和组织名称还未设置，
+        # 过早获取会得到与启动器其他部分不同的数据目录
+        self._cache_dir = cache_dir
+        self._cache_lock = threading.Lock()
+        self._verify_cache = None
+        self._natives_cache = None
+        
+        # 版本清单缓存
+        self.manifest_ttl = self.MANIFEST_CACHE_TTL if manifest_ttl is None else manifest_ttl
+        self._manifest = None
+        self._manifest_meta = {}
+        self._manifest_failed_at = None
+        self._manifest_lock = threading.RLock()
+        
+        # 版本索引，每次加载新的版本清单时重建
+        self._version_index = {}
+        self._versions_by_type = {}
+        
+        # 版本JSON缓存的哈希索引 {version_id: {"sha1": ..., "time": ...}}
+        self._version_hashes = None
+        self._version_cache_lock = threading.RLock()
+        
+        # 版本JSON规则引擎
+        self.rules_engine = RulesEngine()
+    
+    @property
+    def cache_dir(self) -> str:
+        """
+        缓存目录，未指定时在首次使用时确定
+        """
+        with self._cache_lock:
+            if self._cache_dir is None:
+                self._cache_dir = self._get_cache_directory()
+            return self._cache_dir
+    
+    @property
+    def verify_cache(self) -> FileVerifyCache:
+        """
+        文件校验缓存，文件未变化时无需重新计算哈希
+        """
+        if self._verify_cache is None:
+            cache = FileVerifyCache(os.path.join(self.cache_dir, self.VERIFY_CACHE_FILE))
+            with self._cache_lock:
+                if self._verify_cache is None:
+                    self._verify_cache = cache
+        return self._verify_cache
+    
+    @property
+    def natives_cache(self) -> NativesCache:
+        """
+        本地库解压缓存，按内容哈希复用
+        """
+        if self._natives_cache is None:
+            cache = NativesCache(os.path.join(self.cache_dir, "natives"))
+            with self._cache_lock:
+                if self._natives_cache is None:
+                    self._natives_cache = cache
+        return self._natives_cache
+    
+    def _get_cache_directory(self) -> str:
+        """
+        获取缓存目录
+        
+        Returns:
+            str: 缓存目录路径
+        """
+        # 与日志目录保持一致，放在用户数据目录下
+        if os.name == "nt":  # Windows
+            data_dir = os.path.join(os.environ.get("APPDATA", ""), "TMCL")
+        else:
+            data_dir = os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.AppDataLocation),
+                "TMCL"
+            )
+        
+        return os.path.join(data_dir, "cache")
+    
+    def set_manifest_ttl(self, seconds: int):
+        """
+        设置版本清单缓存有效期
+        
+        Args:
+            seconds (int): 有效期（秒），为0时每次都向服务器重新验证
+        """
+        with self._manifest_lock:
+            self.manifest_ttl = max(0, int(seconds))
+    
+    def _write_cache_file(self, file_path: str, data: bytes):
+        """
+        原子方式写入缓存文件，避免中断时留下损坏的缓存
+        
+        Args:
+            file_path (str): 文件路径
+            data (bytes): 文件内容
+        """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    
+    def _load_cached_manifest(self) -> bool:
+        """
+        从磁盘加载缓存的版本清单
+        
+        Returns:
+            bool: 是否成功加载
+        """
+        manifest_path = os.path.join(self.cache_dir, self.MANIFEST_CACHE_FILE)
+        meta_path = os.path.join(self.cache_dir, self.MANIFEST_META_FILE)
+        
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except Exception:
+            return False
+        
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception:
+            # 元数据缺失时视为已过期，下次访问会重新验证
+            meta = {}
+        
+        self._set_manifest(manifest, meta)
+        return True
+    
+    def _set_manifest(self, manifest: Dict, meta: Dict):
+        """
+        设置当前版本清单并重建版本索引
+        
+        Args:
+            manifest (Dict): 版本清单
+            meta (Dict): 缓存元数据
+        """
+        self._manifest = manifest
+        self._manifest_meta = meta
+        self._build_version_index()
+    
+    def _build_version_index(self):
+        """
+        构建版本ID索引和按类型分组、按发布时间排序的版本视图
+        """
+        index = {}
+        by_type = {}
+        
+        for v in self._manifest.get("versions", []):
+            index[v["id"]] = v
+            by_type.setdefault(v.get("type", ""), []).append(v)
+        
+        # 按发布时间从新到旧排序（ISO 8601格式可直接按字符串比较）
+        for versions in by_type.values():
+            versions.sort(key=lambda v: v.get("releaseTime", ""), reverse=True)
+        
+        self._version_index = index
+        self._versions_by_type = by_type
+    
+    def _save_manifest_meta(self):
+        """
+        保存版本清单缓存元数据
+        """
+        try:
+            meta_path = os.path.join(self.cache_dir, self.MANIFEST_META_FILE)
+            self._write_cache_file(meta_path, json.dumps(self._manifest_meta).encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"保存版本清单缓存元数据失败: {str(e)}")
+    
+    def _is_manifest_fresh(self) -> bool:
+        """
+        判断缓存的版本清单是否仍在有效期内
+        
+        Returns:
+            bool: 是否有效
+        """
+        fetched_at = self._manifest_meta.get("fetched_at", 0)
+        return time.time() - fetched_at < self.manifest_ttl
+    
+    def _get_with_failover(self, url: str, **kwargs) -> requests.Response:
+        """
+        按镜像优先级发起GET请求，失败时自动切换到下一个镜像
+        
+        Args:
+            url (str): 官方地址
+            **kwargs: 传递给requests的参数
+        
+        Returns:
+            requests.Response: 响应
+        
+        Raises:
+            Exception: 所有镜像都失败时抛出最后一个错误
+        """
+        def request(mirror_url: str):
+            start = time.monotonic()
+            response = self.session.get(mirror_url, **kwargs)
+            response.raise_for_status()
+            return response, time.monotonic() - start
+        
+        return self.mirrors.call(url, request)
+    
+    def get_manifest(self, force_refresh: bool = False) -> Optional[Dict]:
+        """
+        获取版本清单，优先使用缓存
+        
+        缓存过期后使用ETag/Last-Modified向服务器发起条件请求，
+        返回304时继续使用本地缓存；网络不可用时回退到磁盘缓存，
+        并在MANIFEST_RETRY_BACKOFF内不再重新验证。
+        
+        Args:
+            force_refresh (bool): 是否忽略有效期，强制向服务器重新验证
+        
+        Returns:
+            Optional[Dict]: 版本清单，如果失败则返回None
+        """
+        with self._manifest_lock:
+            if self._manifest is None:
+                self._load_cached_manifest()
+            
+            if self._manifest is not None and not force_refresh:
+                if self._is_manifest_fresh():
+                    return self._manifest
+                if (self._manifest_failed_at is not None
+                        and time.monotonic() - self._manifest_failed_at < self.MANIFEST_RETRY_BACKOFF):
+                    # 上次重新验证刚刚失败，暂不重试
+                    return self._manifest
+            
+            headers = {}
+            if self._manifest is not None:
+                if self._manifest_meta.get("etag"):
+                    headers["If-None-Match"] = self._manifest_meta["etag"]
+                if self._manifest_meta.get("last_modified"):
+                    headers["If-Modified-Since"] = self._manifest_meta["last_modified"]
+            
+            try:
+                response = self._get_with_failover(self.MANIFEST_URL, headers=headers, timeout=10)
+                
+                self._manifest_failed_at = None
+                if response.status_code == 304 and self._manifest is not None:
+                    # 服务器确认缓存未变化
+                    self._manifest_meta["fetched_at"] = time.time()
+                    self._save_manifest_meta()
+                    logger.info("版本清单未变化，使用本地缓存")
+                    return self._manifest
+                
+                response.raise_for_status()
+                manifest = response.json()
+                
+                self._set_manifest(manifest, {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                    "fetched_at": time.time()
+                })
+                
+                try:
+                    manifest_path = os.path.join(self.cache_dir, self.MANIFEST_CACHE_FILE)
+                    self._write_cache_file(manifest_path, response.content)
+                    self._save_manifest_meta()
+                except Exception as e:
+                    logger.warning(f"写入版本清单缓存失败: {str(e)}")
+                
+                logger.info(f"成功获取版本清单，共{len(manifest.get('versions', []))}个版本")
+                return self._manifest
+            except Exception as e:
+                if self._manifest is not None:
+                    # 离线时使用磁盘缓存，并在MANIFEST_RETRY_BACKOFF内不再重试
+                    self._manifest_failed_at = time.monotonic()
+                    logger.warning(f"获取版本清单失败，使用本地缓存: {str(e)}")
+                    return self._manifest
+                
+                logger.error(f"获取版本清单失败: {str(e)}")
+                return None
+    
+    def get_versions(self, force_refresh: bool = False) -> List[Dict]:
+        """
+        获取Minecraft版本列表
+        
+        Args:
+            force_refresh (bool): 是否强制向服务器重新验证版本清单
+        
+        Returns:
+            List[Dict]: 版本信息列表
+        """
+        manifest = self.get_manifest(force_refresh)
+        if not manifest:
+            return []
+        
+        return manifest.get("versions", [])
+    
+    def get_version_entry(self, version_id: str) -> Optional[Dict]:
+        """
+        从版本清单中查找指定版本的条目
+        
+        Args:
+            version_id (str): 版本ID
+        
+        Returns:
+            Optional[Dict]: 版本清单条目，如果不存在则返回None
+        """
+        if not self.get_manifest():
+            return None
+        
+        return self._version_index.get(version_id)
+    
+    def get_versions_by_type(self, version_type: str) -> List[Dict]:
+        """
+        获取指定类型的版本列表，按发布时间从新到旧排序
+        
+        Args:
+            version_type (str): 版本类型 (release, snapshot, old_beta, old_alpha)
+        
+        Returns:
+            List[Dict]: 版本信息列表
+        """
+        if not self.get_manifest():
+            return []
+        
+        return list(self._versions_by_type.get(version_type, []))
+    
+    def get_latest_version(self, version_type: str = "release") -> Optional[Dict]:
+        """
+        获取指定类型的最新版本
+        
+        Args:
+            version_type (str): 版本类型 (release, snapshot等)
+        
+        Returns:
+            Optional[Dict]: 版本清单条目，如果不存在则返回None
+        """
+        manifest = self.get_manifest()
+        if not manifest:
+            return None
+        
+        # 优先使用清单中声明的最新版本
+        latest_id = manifest.get("latest", {}).get(version_type)
+        if latest_id in self._version_index:
+            return self._version_index[latest_id]
+        
+        versions = self._versions_by_type.get(version_type)
+        return versions[0] if versions else None
+    
+    def _get_version_hashes(self) -> Dict:
+        """
+        获取版本JSON缓存的哈希索引
+        
+        Returns:
+            Dict: 哈希索引
+        """
+        if self._version_hashes is None:
+            index_path = os.path.join(self.cache_dir, self.VERSION_HASH_INDEX_FILE)
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    self._version_hashes = json.load(f)
+            except Exception:
+                self._version_hashes = {}
+        
+        return self._version_hashes
+    
+    def _read_cached_version_json(self, version_data: Dict) -> Optional[bytes]:
+        """
+        从本地缓存读取版本JSON，并与版本清单中的sha1进行校验
+        
+        Args:
+            version_data (Dict): 版本清单条目
+        
+        Returns:
+            Optional[bytes]: 版本JSON内容，缓存不存在或已失效时返回None
+        """
+        version_id = version_data["id"]
+        record = self._get_version_hashes().get(version_id)
+        if not record:
+            return None
+        
+        expected_sha1 = version_data.get("sha1")
+        if expected_sha1:
+            if record.get("sha1") != expected_sha1:
+                return None
+        elif record.get("time") != version_data.get("time"):
+            # 清单中没有sha1时，使用版本更新时间判断缓存是否失效
+            return None
+        
+        cache_path = os.path.join(self.cache_dir, "versions", version_id, f"{version_id}.json")
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+        except Exception:
+            return None
+        
+        if hashlib.sha1(data).hexdigest() != record.get("sha1"):
+            logger.warning(f"版本{version_id}的JSON缓存已损坏，将重新下载")
+            return None
+        
+        return data
+    
+    def _store_version_json(self, version_data: Dict, data: bytes):
+        """
+        将版本JSON写入本地缓存并更新哈希索引
+        
+        Args:
+            version_data (Dict): 版本清单条目
+            data (bytes): 版本JSON内容
+        """
+        version_id = version_data["id"]
+        try:
+            cache_path = os.path.join(self.cache_dir, "versions", version_id, f"{version_id}.json")
+            self._write_cache_file(cache_path, data)
+            
+            hashes = self._get_version_hashes()
+            hashes[version_id] = {
+                "sha1": hashlib.sha1(data).hexdigest(),
+                "time": version_data.get("time", "")
+            }
+            index_path = os.path.join(self.cache_dir, self.VERSION_HASH_INDEX_FILE)
+            self._write_cache_file(index_path, json.dumps(hashes).encode("utf-8"))
+            
+            # 版本JSON已变化，之前按规则过滤的库列表失效
+            self.rules_engine.invalidate(version_id)
+        except Exception as e:
+            logger.warning(f"写入版本{version_id}的JSON缓存失败: {str(e)}")
+    
+    def _get_version_json_data(self, version_id: str) -> Optional[bytes]:
+        """
+        获取版本JSON的原始内容，优先使用本地缓存
+        
+        Args:
+            version_id (str): 版本ID
+        
+        Returns:
+            Optional[bytes]: 版本JSON内容，如果失败则返回None
+        """
+        # 从版本索引中查找匹配的版本
+        version_data = self.get_version_entry(version_id)
+        if not version_data:
+            logger.warning(f"未找到版本: {version_id}")
+            return None
+        
+        with self._version_cache_lock:
+            data = self._read_cached_version_json(version_data)
+            if data is not None:
+                return data
+            
+            # 缓存未命中，从网络获取版本详情
+            response = self._get_with_failover(version_data["url"], timeout=10)
+            data = response.content
+            
+            expected_sha1 = version_data.get("sha1")
+            if expected_sha1 and hashlib.sha1(data).hexdigest() != expected_sha1:
+                raise ValueError(f"版本{version_id}的JSON校验失败")
+            
+            self._store_version_json(version_data, data)
+            return data
+    
+    def get_version_info(self, version_id: str) -> Optional[Dict]:
+        """
+        获取特定版本的详细信息
+        
+        Args:
+            version_id (str): 版本ID
+        
+        Returns:
+            Optional[Dict]: 版本详细信息，如果失败则返回None
+        """
+        try:
+            data = self._get_version_json_data(version_id)
+            if data is None:
+                return None
+            
+            logger.info(f"成功获取版本{version_id}的详细信息")
+            return json.loads(data.decode("utf-8"))
+        except Exception as e:
+            logger.error(f"获取版本{version_id}详情失败: {str(e)}")
+            return None
+    
+    def download_file(self, url: str, dest_path: str, chunk_size: int = 0,
+                      expected_size: int = 0, sha1: str = "") -> bool:
+        """
+        下载文件，支持从上次中断的位置续传
+        
+        Args:
+            url (str): 下载URL
+            dest_path (str): 目标文件路径
+            chunk_size (int): 单次读取的最大字节数，为0时使用整个复用缓冲区
+            expected_size (int): 预期文件大小，未知时为0
+            sha1 (str): 预期sha1，未知时为空
+        
+        Returns:
+            bool: 是否下载成功
+        """
+        # 同一文件正在由其他任务下载时等待其完成，不重复下载
+        transfer, owner = self.inflight.acquire(dest_path, sha1, expected_size)
+        if not owner:
+            logger.info(f"文件正在由其他任务下载，等待其完成: {dest_path}")
+            return transfer.wait()
+        
+        success = False
+        try:
+            success = self._download_file(url, dest_path, chunk_size, expected_size, sha1)
+            return success
+        finally:
+            self.inflight.finish(transfer, success)
+    
+    def _download_file(self, url: str, dest_path: str, chunk_size: int, expected_size: int, sha1: str) -> bool:
+        """
+        下载文件到部分下载文件，完成后重命名为目标文件
+        
+        数据通过readinto直接读入复用的缓冲区，写入的同时计算sha1。
+        
+        Args:
+            url (str): 下载URL
+            dest_path (str): 目标文件路径
+            chunk_size (int): 单次读取的最大字节数，为0时使用整个复用缓冲区
+            expected_size (int): 预期文件大小，未知时为0
+            sha1 (str): 预期sha1，未知时为空
+        
+        Returns:
+            bool: 是否下载成功
+        """
+        partial = PartialDownload(dest_path, url, expected_size, sha1)
+        try:
+            # 打开部分下载文件，确定续传位置
+            offset = partial.open()
+            if offset:
+                logger.info(f"从{offset}字节处继续下载: {url}")
+            
+            def fetch(mirror_url: str):
+                start = time.monotonic()
+                with self.session.get(mirror_url, stream=True, timeout=30,
+                                      headers=partial.range_headers()) as response, \
+                        buffer_pool.buffer() as buffer:
+                    offset = partial.accept_status(response.status_code)
+                    response.raise_for_status()
+                    latency = time.monotonic() - start
+                    
+                    content_length = response.headers.get("content-length")
+                    partial.preallocate(expected_size or (offset + int(content_length) if content_length else 0))
+                    
+                    # 由urllib3解压gzip等编码后再读入缓冲区
+                    response.raw.decode_content = True
+                    if chunk_size:
+                        buffer = buffer[:chunk_size]
+                    while True:
+                        size = partial.write_from(response.raw.readinto, buffer)
+                        if not size:
+                            break
+                        self.bandwidth.throttle(size)
+                
+                partial.commit()
+                return mirror_url, latency
+            
+            # 按镜像优先级下载，失败时从已下载的位置切换到下一个镜像继续；
+            # 所有镜像都遇到临时性错误时等待后重试，已下载的部分继续保留
+            mirror_url = self.retry_policy.call(
+                lambda: self.mirrors.call(url, fetch, self.retry_policy.is_transient, "下载"), f"下载{url}"
+            )
+            self.verify_cache.record_file(dest_path, partial.hexdigest())
+            logger.info(f"文件下载成功: {mirror_url} -> {dest_path}")
+            return True
+        except Exception as e:
+            logger.error(f"文件下载失败: {url} -> {dest_path}. 错误: {str(e)}")
+            # 保留已下载的部分，下次下载时续传
+            partial.close()
+            return False
+    
+    def get_mirror_url(self, url: str) -> str:
+        """
+        将官方下载地址转换为当前首选镜像的地址
+        
+        Args:
+            url (str): 官方下载地址
+        
+        Returns:
+            str: 镜像地址，无法识别的地址原样返回
+        """
+        return self.mirrors.resolve(url)
+    
+    def resolve_install_plan(self, version_id: str, dest_dir: str,
+                             features: Optional[Dict[str, bool]] = None) -> Optional[InstallPlan]:
+        """
+        解析版本的安装计划，整个安装过程只获取一次元数据
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 游戏目录
+            features (Optional[Dict[str, bool]]): 规则求值使用的启动特性
+        
+        Returns:
+            Optional[InstallPlan]: 安装计划，如果失败则返回None
+        """
+        try:
+            manifest_entry = self.get_version_entry(version_id)
+            version_info = self.get_version_info(version_id)
+            if not manifest_entry or not version_info:
+                return None
+            
+            plan = InstallPlan(version_id, dest_dir, manifest_entry, version_info)
+            
+            # 客户端jar
+            client = version_info.get("downloads", {}).get("client")
+            if client:
+                plan.client = DownloadItem(
+                    f"{version_id}_client",
+                    client["url"],
+                    os.path.join(plan.version_dir, f"{version_id}.jar"),
+                    client.get("sha1", ""),
+                    client.get("size", 0),
+                    "client"
+                )
+            
+            # 库文件和本地库，先按规则过滤掉当前平台不需要的库
+            context = PlatformContext.current(features)
+            arch_bits = "32" if context.os_arch == "x86" else "64"
+            libraries = self.rules_engine.filter_libraries(version_id, version_info.get("libraries", []), context)
+            for lib in libraries:
+                downloads = lib.get("downloads", {})
+                
+                artifact = downloads.get("artifact")
+                if artifact:
+                    plan.libraries.append(self._make_library_item(version_id, dest_dir, artifact, "library"))
+                
+                classifier = lib.get("natives", {}).get(context.os_name)
+                if classifier:
+                    classifier = classifier.replace("${arch}", arch_bits)
+                    native = downloads.get("classifiers", {}).get(classifier)
+                    if native:
+                        item = self._make_library_item(version_id, dest_dir, native, "native")
+                        plan.natives.append(item)
+                        excludes = lib.get("extract", {}).get("exclude")
+                        if excludes:
+                            plan.native_excludes[item.task_id] = excludes
+            
+            # 资源索引
+            asset_index = version_info.get("assetIndex")
+            if asset_index:
+                plan.asset_index = DownloadItem(
+                    f"{version_id}_asset_index",
+                    asset_index["url"],
+                    os.path.join(dest_dir, "assets", "indexes", f"{asset_index['id']}.json"),
+                    asset_index.get("sha1", ""),
+                    asset_index.get("size", 0),
+                    "asset_index"
+                )
+            
+            return plan
+        except Exception as e:
+            logger.error(f"解析版本{version_id}的安装计划失败: {str(e)}")
+            return None
+    
+    def prepare_natives(self, plan: InstallPlan) -> Optional[str]:
+        """
+        获取版本的本地库目录，同一组本地库只解压一次
+        
+        Args:
+            plan (InstallPlan): 安装计划
+        
+        Returns:
+            Optional[str]: 本地库目录，解压失败时返回None
+        """
+        if self.filter_missing_items(plan.natives):
+            logger.error(f"版本{plan.version_id}的本地库文件缺失或已损坏")
+            return None
+        
+        return self.natives_cache.get_natives_dir(plan.natives, plan.native_excludes)
+    
+    def get_natives_directory(self, version_id: str, dest_dir: str) -> Optional[str]:
+        """
+        获取已安装版本的本地库目录，供启动游戏时使用
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 游戏目录
+        
+        Returns:
+            Optional[str]: 本地库目录，失败时返回None
+        """
+        plan = InstallPlan.load(version_id, dest_dir) or self.resolve_install_plan(version_id, dest_dir)
+        if not plan:
+            return None
+        
+        return self.prepare_natives(plan)
+    
+    def _make_library_item(self, version_id: str, dest_dir: str, artifact: Dict, kind: str) -> DownloadItem:
+        """
+        根据库文件的下载信息创建下载项
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 游戏目录
+            artifact (Dict): 版本JSON中的artifact或classifier信息
+            kind (str): 文件类型
+        
+        Returns:
+            DownloadItem: 下载项
+        """
+        return DownloadItem(
+            f"{version_id}_lib_{artifact['path']}",
+            artifact["url"],
+            os.path.join(dest_dir, "libraries", artifact["path"]),
+            artifact.get("sha1", ""),
+            artifact.get("size", 0),
+            kind
+        )
+    
+    def filter_missing_items(self, items: List[DownloadItem], deep: bool = False) -> List[DownloadItem]:
+        """
+        过滤掉本地已存在且大小和sha1都正确的文件，只保留缺失或损坏的文件
+        
+        Args:
+            items (List[DownloadItem]): 下载项列表
+            deep (bool): 是否忽略校验缓存，强制重新计算所有文件的哈希
+        
+        Returns:
+            List[DownloadItem]: 需要下载的下载项列表
+        """
+        results = self.verify_cache.verify_files([(item.path, item.size, item.sha1) for item in items], deep)
+        missing = [item for item, valid in zip(items, results) if not valid]
+        self.verify_cache.flush()
+        
+        skipped_count = len(items) - len(missing)
+        if skipped_count:
+            logger.info(f"跳过{skipped_count}个已存在且校验通过的文件")
+        return missing
+    
+    def resolve_asset_items(self, plan: InstallPlan) -> Optional[List[DownloadItem]]:
+        """
+        根据资源索引解析需要的资源对象，索引不存在或已损坏时先下载索引
+        
+        Args:
+            plan (InstallPlan): 安装计划
+        
+        Returns:
+            Optional[List[DownloadItem]]: 去重后的资源对象下载项，获取索引失败时返回None
+        """
+        index_item = plan.asset_index
+        if not index_item:
+            return []
+        
+        # 资源索引是后续阶段的依赖，需要先下载
+        if self.filter_missing_items([index_item]):
+            if not self.download_file(index_item.url, index_item.path,
+                                      expected_size=index_item.size, sha1=index_item.sha1):
+                return None
+        
+        asset_index = Utils.read_json_file(index_item.path)
+        if asset_index is None:
+            logger.error(f"读取资源索引失败: {index_item.path}")
+            return None
+        
+        # 不同资源可能指向同一个对象，按哈希去重
+        objects_dir = os.path.join(plan.dest_dir, "assets", "objects")
+        items = {}
+        for obj in asset_index.get("objects", {}).values():
+            object_hash = obj["hash"]
+            if object_hash in items:
+                continue
+            
+            object_path = f"{object_hash[:2]}/{object_hash}"
+            items[object_hash] = DownloadItem(
+                f"asset_{object_hash}",
+                f"https://resources.download.minecraft.net/{object_path}",
+                os.path.join(objects_dir, object_hash[:2], object_hash),
+                object_hash,
+                obj.get("size", 0),
+                "asset"
+            )
+        
+        return list(items.values())
+    
+    def download_client(self, version_id: str, dest_dir: str, plan: Optional[InstallPlan] = None) -> bool:
+        """
+        下载客户端jar文件
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 目标目录
+            plan (Optional[InstallPlan]): 已解析的安装计划，为None时重新解析
+        
+        Returns:
+            bool: 是否下载成功
+        """
+        try:
+            # 获取安装计划
+            plan = plan or self.resolve_install_plan(version_id, dest_dir)
+            if not plan or not plan.client:
+                return False
+            
+            # 本地文件校验通过时无需下载客户端jar文件
+            if not self.filter_missing_items([plan.client]):
+                return True
+            
+            client = plan.client
+            return self.download_file(client.url, client.path, expected_size=client.size, sha1=client.sha1)
+        except Exception as e:
+            logger.error(f"下载客户端{version_id}失败: {str(e)}")
+            return False
+    
+    def download_libraries(self, version_id: str, dest_dir: str, plan: Optional[InstallPlan] = None) -> bool:
+        """
+        下载版本所需的库文件
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 目标目录
+            plan (Optional[InstallPlan]): 已解析的安装计划，为None时重新解析
+        
+        Returns:
+            bool: 是否所有库下载成功
+        """
+        try:
+            # 获取安装计划
+            plan = plan or self.resolve_install_plan(version_id, dest_dir)
+            if not plan:
+                return False
+            
+            success_count = 0
+            failed_count = 0
+            
+            for item in self.filter_missing_items(plan.libraries + plan.natives):
+                # 下载库文件
+                if self.download_file(item.url, item.path, expected_size=item.size, sha1=item.sha1):
+                    success_count += 1
+                else:
+                    failed_count += 1
+            
+            logger.info(f"库文件下载完成: 成功{success_count}, 失败{failed_count}")
+            return failed_count == 0
+        except Exception as e:
+            logger.error(f"下载库文件失败: {str(e)}")
+            return False
+    
+    def download_assets(self, version_id: str, dest_dir: str, plan: Optional[InstallPlan] = None) -> bool:
+        """
+        下载版本所需的资源索引和资源对象
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 目标目录
+            plan (Optional[InstallPlan]): 已解析的安装计划，为None时重新解析
+        
+        Returns:
+            bool: 是否所有资源下载成功
+        """
+        try:
+            # 获取安装计划
+            plan = plan or self.resolve_install_plan(version_id, dest_dir)
+            if not plan:
+                return False
+            
+            asset_items = self.resolve_asset_items(plan)
+            if asset_items is None:
+                return False
+            
+            success_count = 0
+            failed_count = 0
+            
+            for item in self.filter_missing_items(asset_items):
+                if self.download_file(item.url, item.path, expected_size=item.size, sha1=item.sha1):
+                    success_count += 1
+                else:
+                    failed_count += 1
+            
+            logger.info(f"资源文件下载完成: 成功{success_count}, 失败{failed_count}")
+            return failed_count == 0
+        except Exception as e:
+            logger.error(f"下载资源文件失败: {str(e)}")
+            return False
+    
+    def download_version_json(self, version_id: str, dest_dir: str) -> bool:
+        """
+        下载版本JSON文件
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 目标目录
+        
+        Returns:
+            bool: 是否下载成功
+        """
+        try:
+            # 版本JSON优先从本地缓存获取；写入原始内容，使文件的sha1与版本清单一致
+            data = self._get_version_json_data(version_id)
+            if data is None:
+                return False
+            
+            # 写入JSON文件
+            dest_path = os.path.join(dest_dir, f"versions/{version_id}/{version_id}.json")
+            self._write_cache_file(dest_path, data)
+            return True
+        except Exception as e:
+            logger.error(f"下载版本JSON文件失败: {str(e)}")
+            return False
+
+class DownloadTask(QThread):
+    """
+    下载任务线程，用于在后台下载文件
+    """
+    # 进度信号
+    progress_updated = pyqtSignal(str, int, int)  # task_id, downloaded_size, total_size
+    # 完成信号
+    task_completed = pyqtSignal(str, bool, str)  # task_id, success, message
+    
+    # 两次发出进度信号的最小间隔（秒），很快完成的小文件不发出进度信号
+    PROGRESS_INTERVAL = 0.1
+    
+    def __init__(self, task_id: str, url: str, dest_path: str, expected_size: int = 0, sha1: str = "",
+                 session: Optional[requests.Session] = None, inflight: Optional[InFlightRegistry] = None,
+                 retry_policy: Optional[RetryPolicy] = None, bandwidth: Optional[BandwidthLimiter] = None,
+                 verify_cache: Optional[FileVerifyCache] = None, mirrors: Optional[MirrorRegistry] = None):
+        """
+        初始化下载任务
+        
+        Args:
+            task_id (str): 任务ID
+            url (str): 下载URL，使用镜像时为官方地址
+            dest_path (str): 目标文件路径
+            expected_size (int): 预期文件大小，未知时为0
+            sha1 (str): 预期sha1，未知时为空
+            session (Optional[requests.Session]): 复用连接的HTTP会话，为None时单独建立连接
+            inflight (Optional[InFlightRegistry]): 正在进行的下载登记表，用于合并重复的下载
+            retry_policy (Optional[RetryPolicy]): 重试策略，为None时使用默认策略
+            bandwidth (Optional[BandwidthLimiter]): 带宽限制器，为None时不限速
+            verify_cache (Optional[FileVerifyCache]): 文件校验缓存，下载完成后记录边下载边计算的sha1
+            mirrors (Optional[MirrorRegistry]): 镜像注册表，失败时切换镜像；为None时直接从url下载
+        """
+        super().__init__()
+        self.task_id = task_id
+        self.url = url
+        self.dest_path = dest_path
+        self.expected_size = expected_size
+        self.session = session or requests
+        self.inflight = inflight
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.bandwidth = bandwidth
+        self.verify_cache = verify_cache
+        self.mirrors = mirrors
+        self.sha1 = sha1
+        self.abort_flag = False
+        self._partial = PartialDownload(dest_path, url, expected_size, sha1)
+        self._response = None
+        self._success = False
+    
+    def run(self):
+        """
+        运行下载任务，同一文件正在由其他任务下载时等待其完成
+        """
+        if self.inflight is None:
+            self._download()
+            return
+        
+        transfer, owner = self.inflight.acquire(self.dest_path, self.sha1, self.expected_size)
+        if not owner:
+            success = transfer.wait()
+            self.task_completed.emit(self.task_id, success, "下载成功" if success else "下载失败: 合并的下载失败")
+            return
+        
+        self._success = False
+        try:
+            self._download()
+        finally:
+            self.inflight.finish(transfer, self._success)
+    
+    def _download(self):
+        """
+        下载文件，数据边接收边写入部分下载文件，完成后重命名为目标文件
+        """
+        try:
+            # 打开部分下载文件，确定续传位置
+            self._partial.open()
+            
+            # 遇到临时性错误或校验失败时等待后重试，已下载的部分继续保留
+            self.retry_policy.call(self._attempt, f"下载{self.url}", lambda: self.abort_flag)
+            
+            if self.abort_flag:
+                # 保留已下载的部分，下次下载时续传
+                self._partial.close()
+                self.task_completed.emit(self.task_id, False, "下载已取消")
+                return
+            
+            if self.verify_cache is not None:
+                self.verify_cache.record_file(self.dest_path, self._partial.hexdigest())
+            self._success = True
+            self.task_completed.emit(self.task_id, True, "下载成功")
+        except Exception as e:
+            # 保留已下载的部分，下次下载时续传
+            self._partial.close()
+            if self.abort_flag:
+                self.task_completed.emit(self.task_id, False, "下载已取消")
+            else:
+                self.task_completed.emit(self.task_id, False, f"下载失败: {str(e)}")
+    
+    def _attempt(self):
+        """
+        按镜像优先级尝试下载一次，失败时从已下载的位置切换到下一个镜像继续
+        """
+        if self.mirrors is None:
+            self._fetch(self.url)
+        else:
+            self.mirrors.call(self.url, self._fetch, self.retry_policy.is_transient, "下载", lambda: self.abort_flag)
+    
+    def _fetch(self, url: str) -> Tuple[None, Optional[float]]:
+        """
+        发送一次请求，将响应数据写入部分下载文件，接收完整后校验并重命名为目标文件
+        
+        Args:
+            url (str): 下载地址
+        
+        Returns:
+            Tuple[None, Optional[float]]: (None, 收到响应头的耗时)，下载被中止时耗时为None
+        """
+        headers = {"User-Agent": "TMCL Launcher"}
+        headers.update(self._partial.range_headers())
+        start = time.monotonic()
+        try:
+            with self.session.get(url, stream=True, timeout=30, headers=headers) as response, \
+                    buffer_pool.buffer() as buffer:
+                self._response = response
+                offset = self._partial.accept_status(response.status_code)
+                response.raise_for_status()
+                latency = time.monotonic() - start
+                
+                # 续传时总大小加上已有部分的大小
+                content_length = response.headers.get("content-length")
+                total_size = self.expected_size or (offset + int(content_length) if content_length else -1)
+                self._partial.preallocate(total_size)
+                
+                # 数据通过readinto直接读入复用的缓冲区，由urllib3解压gzip等编码
+                response.raw.decode_content = True
+                last_progress = time.monotonic()
+                while not self.abort_flag:
+                    size = self._partial.write_from(response.raw.readinto, buffer)
+                    if not size:
+                        break
+                    if self.bandwidth is not None:
+                        self.bandwidth.throttle(size, self.task_id)
+                    now = time.monotonic()
+                    if now - last_progress >= self.PROGRESS_INTERVAL:
+                        last_progress = now
+                        self.progress_updated.emit(self.task_id, self._partial.bytes_written, total_size)
+        finally:
+            self._response = None
+        
+        if self.abort_flag:
+            return None, None
+        self._partial.commit()
+        return None, latency
+    
+    def abort(self):
+        """
+        中止下载任务
+        """
+        self.abort_flag = True
+        
+        # 关闭响应，使下载线程中阻塞的读取立即结束
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+class EngineDownloadThread(QThread):
+    """
+    下载引擎线程，在后台线程中运行asyncio下载引擎
+    """
+    # 进度信号
+    progress_updated = pyqtSignal(str, int, int)  # task_id, downloaded_size, total_size
+    # 单个任务完成信号
+    task_completed = pyqtSignal(str, bool, str)  # task_id, success, message
+    # 全部任务完成信号
+    all_completed = pyqtSignal(bool, str)  # success, message
+    
+    # 同一文件两次发出进度信号的最小间隔（秒），很快完成的小文件不发出进度信号
+    PROGRESS_INTERVAL = 0.1
+    
+    def __init__(self, engine: AsyncDownloadEngine, items: Union[List[DownloadItem], DownloadQueue]):
+        """
+        初始化下载引擎线程
+        
+        Args:
+            engine (AsyncDownloadEngine): 下载引擎
+            items (Union[List[DownloadItem], DownloadQueue]): 下载项列表或下载队列
+        """
+        super().__init__()
+        self.engine = engine
+        self.items = items
+        self._progress_times = {}
+    
+    def _on_progress(self, task_id: str, downloaded_size: int, total_size: int):
+        """
+        引擎进度回调，按PROGRESS_INTERVAL限制发出进度信号的频率
+        
+        Args:
+            task_id (str): 任务ID
+            downloaded_size (int): 已下载大小
+            total_size (int): 总大小
+        """
+        now = time.monotonic()
+        last = self._progress_times.setdefault(task_id, now)
+        if now - last >= self.PROGRESS_INTERVAL:
+            self._progress_times[task_id] = now
+            self.progress_updated.emit(task_id, downloaded_size, total_size)
+    
+    def _on_completed(self, task_id: str, success: bool, message: str):
+        """
+        引擎单个任务完成回调
+        
+        Args:
+            task_id (str): 任务ID
+            success (bool): 是否成功
+            message (str): 消息
+        """
+        self._progress_times.pop(task_id, None)
+        self.task_completed.emit(task_id, success, message)
+    
+    def run(self):
+        """
+        运行下载引擎
+        """
+        try:
+            results = self.engine.run(self.items, self._on_progress, self._on_completed)
+            failed_count = sum(1 for success in results.values() if not success)
+            
+            if failed_count:
+                self.all_completed.emit(False, f"{failed_count}个文件下载失败")
+            else:
+                self.all_completed.emit(True, "下载完成")
+        except Exception as e:
+            self.all_completed.emit(False, f"下载失败: {str(e)}")
+    
+    def abort(self):
+        """
+        中止下载
+        """
+        self.engine.abort()
+
+class InstallPrepareThread(QThread):
+    """
+    安装准备线程，在后台线程中解析安装计划、获取资源索引并筛选需要下载的文件
+    """
+    # 准备完成信号，items为None表示准备失败
+    prepared = pyqtSignal(str, object, str)  # job_id, items, message
+    
+    def __init__(self, job_id: str, prepare: Callable[[], Tuple[Optional[List[DownloadItem]], str]]):
+        """
+        初始化安装准备线程
+        
+        Args:
+            job_id (str): 下载任务ID
+            prepare (Callable[[], Tuple[Optional[List[DownloadItem]], str]]): 准备函数，返回需要下载的文件和消息
+        """
+        super().__init__()
+        self.job_id = job_id
+        self.prepare = prepare
+    
+    def run(self):
+        """
+        运行准备函数
+        """
+        try:
+            items, message = self.prepare()
+        except Exception as e:
+            logger.error(f"准备下载任务{self.job_id}失败: {str(e)}")
+            items, message = None, f"准备下载失败: {str(e)}"
+        self.prepared.emit(self.job_id, items, message)
+
+class VersionDownloadManager:
+    """
+    版本下载管理器，用于管理版本下载任务
+    
+    每次安装或修复作为一个下载任务加入共享的下载队列，多个任务可以同时进行：
+    并发数在任务之间平分，多个任务需要的同一个文件只下载一次。
+    """
+    
+    def __init__(self, api_client: BMCLAPIClient):
+        """
+        初始化下载管理器
+        
+        Args:
+            api_client (BMCLAPIClient): API客户端实例
+        """
+        self.api_client = api_client
+        self.download_tasks = {}
+        self.lock = threading.RLock()
+        
+        # 并发数根据吞吐量、错误率和延迟自适应调整，小文件和大文件分别计算
+        self.concurrency = AdaptiveConcurrency()
+        self.active_downloads = {}
+        
+        # 按优先级排列的下载队列，每个并发预算单独建堆
+        self.download_queue = DownloadQueue(lane=lambda item: self.concurrency.budget_for(item.size))
+        self.download_started = {}
+        
+        # 所有下载中文件的汇总进度，按固定间隔通知进度回调
+        self.progress = DownloadProgress()
+        self.progress_callbacks = []
+        
+        # 进行中的下载任务，以及排队或下载中的文件属于哪些任务
+        self.jobs = {}
+        self.file_owners = {}
+        self.file_tasks = {}
+        self.task_files = {}
+        
+        # 正在后台准备的下载任务：解析安装计划、获取资源索引和校验已有文件都不在调用者线程中进行
+        self.prepare_threads = {}
+        
+        # asyncio下载引擎，依赖不可用时回退到逐文件的DownloadTask线程；
+        # 安装了h2时对支持HTTP/2的镜像多路复用连接
+        self.download_engine = AsyncDownloadEngine(
+            mirrors=api_client.mirrors, concurrency=self.concurrency, inflight=api_client.inflight,
+            retry_policy=api_client.retry_policy, bandwidth=api_client.bandwidth, http2=True
+        ) if AsyncDownloadEngine.is_available() else None
+        self.engine_thread = None
+    
+    def set_engine_limits(self, max_concurrency: Optional[int] = None, per_host_limit: Optional[int] = None):
+        """
+        设置下载引擎的并发限制
+        
+        Args:
+            max_concurrency (Optional[int]): 全局最大并发下载数
+            per_host_limit (Optional[int]): 单个主机的最大并发下载数
+        """
+        if self.download_engine:
+            self.download_engine.set_limits(max_concurrency, per_host_limit)
+    
+    def set_bandwidth_limit(self, rate: int):
+        """
+        设置全局下载速率，正在进行的下载立即生效
+        
+        Args:
+            rate (int): 速率（字节/秒），为0时不限速
+        """
+        self.api_client.bandwidth.set_global_limit(rate)
+    
+    def set_job_bandwidth_limit(self, job_id: str, rate: int):
+        """
+        设置单个下载任务的速率，正在进行的下载立即生效
+        
+        Args:
+            job_id (str): 下载任务ID
+            rate (int): 速率（字节/秒），为0时不限速
+        """
+        self.api_client.bandwidth.set_job_limit(job_id, rate)
+    
+    def set_game_running(self, running: bool):
+        """
+        设置游戏是否正在运行，游戏运行时后台下载自动限速
+        
+        Args:
+            running (bool): 游戏是否正在运行
         """
-        self.session = requests.Session()
-        self.headers = {
-            "User-Agent": "TMCL Launcher",
-            "Accept": "application/json"
-        }
-        self.session.headers.update(self.headers)
+        self.api_client.bandwidth.set_game_running(running)
+        logger.info("游戏运行中，后台下载已限速" if running else "游戏已退出，恢复下载速率")
     
-    def get_versions(self) -> List[Dict]:
+    def add_progress_callback(self, callback):
         """
-        获取Minecraft版本列表
+        添加汇总进度回调，在主线程中按固定间隔调用
         
-        Returns:
-            List[Dict]: 版本信息列表
+        Args:
+            callback: 进度回调函数，参数为DownloadProgress.snapshot()返回的进度
         """
-        try:
-            url = f"{self.API_BASE_URL}/mc/game/version_manifest.json"
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            versions = data.get("versions", [])
-            logger.info(f"成功获取版本列表，共{len(versions)}个版本")
-            return versions
-        except Exception as e:
-            logger.error(f"获取版本列表失败: {str(e)}")
-            return []
+        if callback not in self.progress_callbacks:
+            self.progress_callbacks.append(callback)
     
-    def get_version_info(self, version_id: str) -> Optional[Dict]:
+    def remove_progress_callback(self, callback):
         """
-        获取特定版本的详细信息
+        移除汇总进度回调
         
         Args:
-            version_id (str): 版本ID
-            
+            callback: 进度回调函数
+        """
+        if callback in self.progress_callbacks:
+            self.progress_callbacks.remove(callback)
+    
+    def get_progress(self) -> Dict:
+        """
+        获取所有下载中文件的汇总进度
+        
         Returns:
-            Optional[Dict]: 版本详细信息，如果失败则返回None
+            Dict: 汇总进度
         """
-        try:
-            # 首先获取版本清单
-            versions = self.get_versions()
-            
-            # 查找匹配的版本
-            version_data = None
-            for v in versions:
-                if v["id"] == version_id:
-                    version_data = v
-                    break
-            
-            if not version_data:
-                logger.warning(f"未找到版本: {version_id}")
-                return None
-            
-            # 获取版本详情
-            url = version_data["url"]
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            logger.info(f"成功获取版本{version_id}的详细信息")
-            return response.json()
-        except Exception as e:
-            logger.error(f"获取版本{version_id}详情失败: {str(e)}")
-            return None
+        return self.progress.snapshot()
     
-    def download_file(self, url: str, dest_path: str, chunk_size: int = 8192) -> bool:
+    def _report_progress(self, force: bool = False):
         """
-        下载文件
+        通知进度回调，未到报告时间时跳过
         
         Args:
-            url (str): 下载URL
-            dest_path (str): 目标文件路径
-            chunk_size (int): 下载块大小
-            
-        Returns:
-            bool: 是否下载成功
+            force (bool): 是否忽略报告间隔
         """
-        try:
-            # 确保目标目录存在
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-            
-            # 下载文件
-            with self.session.get(url, stream=True, timeout=30) as response:
-                response.raise_for_status()
-                total_size = int(response.headers.get("content-length", 0))
-                downloaded_size = 0
-                
-                with open(dest_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-            
-            logger.info(f"文件下载成功: {url} -> {dest_path}")
-            return True
-        except Exception as e:
-            logger.error(f"文件下载失败: {url} -> {dest_path}. 错误: {str(e)}")
-            # 如果下载失败，删除部分下载的文件
-            if os.path.exists(dest_path):
-                try:
-                    os.remove(dest_path)
-                except:
-                    pass
-            return False
+        if not self.progress_callbacks:
+            return
+        snapshot = self.progress.poll(force)
+        if snapshot is None:
+            return
+        for callback in list(self.progress_callbacks):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"进度回调出错: {str(e)}")
     
-    def download_client(self, version_id: str, dest_dir: str) -> bool:
+    def download_version(self, version_id: str, dest_dir: str, callback=None) -> str:
         """
-        下载客户端jar文件
+        下载完整版本
         
         Args:
             version_id (str): 版本ID
             dest_dir (str): 目标目录
-            
+            callback: 完成回调函数
+        
         Returns:
-            bool: 是否下载成功
+            str: 下载任务ID，准备失败或不需要下载时通过回调通知
         """
-        try:
-            # 获取版本信息
-            version_info = self.get_version_info(version_id)
-            if not version_info:
-                return False
-            
-            # 获取客户端下载URL
-            client_url = f"{self.API_BASE_URL}/mc/game/{version_info['downloads']['client']['sha1']}/{version_info['downloads']['client']['url'].split('/')[-1]}"
-            
-            # 下载客户端jar文件
-            dest_path = os.path.join(dest_dir, f"versions/{version_id}/{version_id}.jar")
-            return self.download_file(client_url, dest_path)
-        except Exception as e:
-            logger.error(f"下载客户端{version_id}失败: {str(e)}")
-            return False
+        def prepare():
+            # 解析安装计划，整个安装过程只获取一次元数据
+            plan = self.api_client.resolve_install_plan(version_id, dest_dir)
+            if not plan:
+                return None, "获取版本信息失败"
+            return self._prepare_plan(plan)
+        
+        return self._start_job(version_id, prepare, callback)
     
-    def download_libraries(self, version_id: str, dest_dir: str) -> bool:
+    def repair_version(self, version_id: str, dest_dir: str, callback=None,
+                       deep_verify: bool = False) -> str:
         """
-        下载版本所需的库文件
+        修复已安装的版本，优先复用保存的安装计划
         
         Args:
             version_id (str): 版本ID
             dest_dir (str): 目标目录
-            
+            callback: 完成回调函数
+            deep_verify (bool): 是否忽略校验缓存，重新计算所有文件的哈希
+        
         Returns:
-            bool: 是否所有库下载成功
+            str: 下载任务ID，准备失败或不需要下载时通过回调通知
         """
-        try:
-            # 获取版本信息
-            version_info = self.get_version_info(version_id)
-            if not version_info:
-                return False
-            
-            libraries = version_info.get("libraries", [])
-            success_count = 0
-            failed_count = 0
-            
-            for lib in libraries:
-                # 获取库的下载信息
-                downloads = lib.get("downloads", {})
-                artifact = downloads.get("artifact", {})
-                
-                if not artifact:
-                    continue
-                
-                # 构建下载URL和目标路径
-                url = artifact["url"]
-                path = os.path.join(dest_dir, "libraries", url.split("maven/")[-1])
-                
-                # 下载库文件
-                maven_path = url.split('maven/')[-1]
-                download_url = f"{self.API_BASE_URL}/maven/{maven_path}"
-                if self.download_file(download_url, path):
-                    success_count += 1
-                else:
-                    failed_count += 1
-            
-            logger.info(f"库文件下载完成: 成功{success_count}, 失败{failed_count}")
-            return failed_count == 0
-        except Exception as e:
-            logger.error(f"下载库文件失败: {str(e)}")
-            return False
+        def prepare():
+            plan = InstallPlan.load(version_id, dest_dir)
+            if not plan:
+                plan = self.api_client.resolve_install_plan(version_id, dest_dir)
+                if not plan:
+                    return None, "获取版本信息失败"
+            return self._prepare_plan(plan, deep_verify)
+        
+        return self._start_job(version_id, prepare, callback)
     
-    def download_version_json(self, version_id: str, dest_dir: str) -> bool:
+    def install_plan(self, plan: InstallPlan, callback=None, deep_verify: bool = False) -> str:
         """
-        下载版本JSON文件
+        按照安装计划下载版本文件
         
         Args:
-            version_id (str): 版本ID
-            dest_dir (str): 目标目录
-            
+            plan (InstallPlan): 安装计划
+            callback: 完成回调函数
+            deep_verify (bool): 是否忽略校验缓存，重新计算所有文件的哈希
+        
         Returns:
-            bool: 是否下载成功
+            str: 下载任务ID，准备失败或不需要下载时通过回调通知
         """
-        try:
-            # 获取版本清单
-            versions = self.get_versions()
-            
-            # 查找匹配的版本
-            version_data = None
-            for v in versions:
-                if v["id"] == version_id:
-                    version_data = v
-                    break
-            
-            if not version_data:
-                return False
-            
-            # 下载JSON文件
-            url = version_data["url"]
-            dest_path = os.path.join(dest_dir, f"versions/{version_id}/{version_id}.json")
-            return self.download_file(url, dest_path)
-        except Exception as e:
-            logger.error(f"下载版本JSON文件失败: {str(e)}")
-            return False
-
-class DownloadTask(QThread):
-    """
-    下载任务线程，用于在后台下载文件
-    """
-    # 进度信号
-    progress_updated = pyqtSignal(str, int, int)  # task_id, downloaded_size, total_size
-    # 完成信号
-    task_completed = pyqtSignal(str, bool, str)  # task_id, success, message
+        return self._start_job(plan.version_id, lambda: self._prepare_plan(plan, deep_verify), callback)
     
-    def __init__(self, task_id: str, url: str, dest_path: str):
+    def _prepare_plan(self, plan: InstallPlan,
+                      deep_verify: bool = False) -> Tuple[Optional[List[DownloadItem]], str]:
         """
-        初始化下载任务
+        写入版本JSON、获取资源索引并筛选需要下载的文件，在准备线程中运行
         
         Args:
-            task_id (str): 任务ID
-            url (str): 下载URL
-            dest_path (str): 目标文件路径
+            plan (InstallPlan): 安装计划
+            deep_verify (bool): 是否忽略校验缓存，重新计算所有文件的哈希
+        
+        Returns:
+            Tuple[Optional[List[DownloadItem]], str]: 需要下载的文件和消息，失败时文件为None
         """
-        super().__init__()
-        self.task_id = task_id
-        self.url = url
-        self.dest_path = dest_path
-        self.abort_flag = False
+        # 写入版本JSON并保存安装计划，供修复时复用；已安装的版本JSON与安装计划中的sha1一致时
+        # 无需再通过版本清单获取，使离线时也能按保存的安装计划修复
+        version_json_path = os.path.join(plan.dest_dir, "versions", plan.version_id, f"{plan.version_id}.json")
+        version_json_sha1 = plan.manifest_entry.get("sha1", "")
+        if not (version_json_sha1 and self.api_client.verify_cache.verify_file(
+                version_json_path, expected_sha1=version_json_sha1, deep=deep_verify)):
+            if not self.api_client.download_version_json(plan.version_id, plan.dest_dir):
+                return None, "写入版本JSON失败"
+        plan.save()
+        
+        # 资源对象由资源索引决定，索引在此之前下载
+        asset_items = self.api_client.resolve_asset_items(plan)
+        if asset_items is None:
+            return None, "获取资源索引失败"
+        
+        # 只下载缺失或损坏的文件，共享资源库中已有的对象会被跳过
+        items = self.api_client.filter_missing_items(plan.all_items() + asset_items, deep_verify)
+        if not items:
+            return [], "所有文件已是最新"
+        return items, ""
     
-    def run(self):
+    def _start_job(self, version_id: str, prepare: Callable[[], Tuple[Optional[List[DownloadItem]], str]],
+                   callback=None) -> str:
         """
-        运行下载任务
+        创建下载任务并在准备线程中确定需要下载的文件，准备完成后再加入共享的下载队列
+        
+        Args:
+            version_id (str): 版本ID
+            prepare (Callable[[], Tuple[Optional[List[DownloadItem]], str]]): 准备函数
+            callback: 完成回调函数
+        
+        Returns:
+            str: 下载任务ID
         """
-        try:
-            # 确保目标目录存在
-            os.makedirs(os.path.dirname(self.dest_path), exist_ok=True)
-            
-            # 使用PyQt的网络请求进行下载
-            nam = QNetworkAccessManager()
-            request = QNetworkRequest(QUrl(self.url))
-            request.setRawHeader(b"User-Agent", b"TMCL Launcher")
-            
-            # 发送请求
-            reply = nam.get(request)
-            
-            # 连接信号
-            reply.downloadProgress.connect(self._on_download_progress)
-            reply.finished.connect(self._on_download_finished)
-            
-            # 等待完成或中断
-            while not reply.isFinished() and not self.abort_flag:
-                self.msleep(100)
-            
-            if self.abort_flag:
-                reply.abort()
-                self.task_completed.emit(self.task_id, False, "下载已取消")
+        job = DownloadJob(version_id, callback)
+        job.preparing = True
+        with self.lock:
+            self.jobs[job.job_id] = job
+        
+        thread = InstallPrepareThread(job.job_id, prepare)
+        thread.prepared.connect(self._on_job_prepared)
+        self.prepare_threads[job.job_id] = thread
+        thread.start()
+        return job.job_id
+    
+    def _on_job_prepared(self, job_id: str, items: Optional[List[DownloadItem]], message: str):
+        """
+        准备线程完成回调，将需要下载的文件加入共享的下载队列
+        
+        Args:
+            job_id (str): 下载任务ID
+            items (Optional[List[DownloadItem]]): 需要下载的文件，准备失败时为None
+            message (str): 消息
+        """
+        thread = self.prepare_threads.pop(job_id, None)
+        if thread is not None:
+            thread.wait()
+        
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                # 准备期间任务已被取消
                 return
-            
-            # 写入文件
-            if reply.error() == QNetworkReply.NoError:
-                with open(self.dest_path, "wb") as f:
-                    f.write(reply.readAll())
-                self.task_completed.emit(self.task_id, True, "下载成功")
-            else:
-                self.task_completed.emit(self.task_id, False, f"下载失败: {reply.errorString()}")
-                
-        except Exception as e:
-            self.task_completed.emit(self.task_id, False, f"下载失败: {str(e)}")
-            # 清理部分下载的文件
-            if os.path.exists(self.dest_path):
-                try:
-                    os.remove(self.dest_path)
-                except:
-                    pass
+            job.preparing = False
+            if not items:
+                self.jobs.pop(job_id)
+        
+        if not items:
+            if job.callback:
+                job.callback(items is not None, message)
+            return
+        
+        self._start_downloads(items, job=job)
     
-    def _on_download_progress(self, bytes_received: int, bytes_total: int):
+    def _start_downloads(self, tasks: List[DownloadItem], callback=None, version_id: str = "",
+                         job: Optional[DownloadJob] = None) -> str:
         """
-        下载进度更新回调
+        将下载任务的文件加入共享的下载队列
+        
+        其他任务已经在排队或下载的文件不会重复加入，完成后同时计入所有需要它的任务。
         
         Args:
-            bytes_received (int): 已接收字节数
-            bytes_total (int): 总字节数
+            tasks (List[DownloadItem]): 下载项列表
+            callback: 完成回调函数
+            version_id (str): 版本ID
+            job (Optional[DownloadJob]): 已创建的下载任务，为None时新建
+        
+        Returns:
+            str: 下载任务ID
         """
-        self.progress_updated.emit(self.task_id, bytes_received, bytes_total)
+        if job is None:
+            job = DownloadJob(version_id, callback)
+        shared_count = 0
+        
+        with self.lock:
+            # 上一轮下载已全部结束，重新开始统计进度
+            if self.progress.finished:
+                self.progress.reset()
+            
+            self.jobs[job.job_id] = job
+            new_items = []
+            for item in tasks:
+                key = os.path.normcase(os.path.abspath(item.path))
+                job.add_file(key, item.size)
+                
+                owners = self.file_owners.get(key)
+                if owners is not None:
+                    owners.add(job.job_id)
+                    shared_count += 1
+                    continue
+                
+                # 同一版本安装到不同目录时任务ID相同，需要区分
+                if item.task_id in self.task_files:
+                    item = DownloadItem.from_dict(item.to_dict())
+                    item.task_id = f"{item.task_id}@{job.job_id}"
+                
+                self.file_owners[key] = {job.job_id}
+                self.file_tasks[key] = item.task_id
+                self.task_files[item.task_id] = (key, item.size)
+                self.progress.add_task(item.task_id, item.size)
+                self.api_client.bandwidth.assign(item.task_id, job.job_id)
+                new_items.append(item)
+            
+            self.download_queue.extend(new_items, group=job.job_id)
+        
+        if shared_count:
+            logger.info(f"下载任务{job.job_id}中有{shared_count}个文件与其他任务共享，只下载一次")
+        
+        self._dispatch()
+        return job.job_id
     
-    def _on_download_finished(self):
+    def _dispatch(self):
         """
-        下载完成回调
+        开始下载队列中的文件
         """
-        pass
+        if self.download_engine:
+            # 引擎线程运行时会持续从共享队列中取出新加入的文件，唤醒它以便立即开始下载
+            if self.engine_thread is None:
+                self._start_engine_downloads()
+            else:
+                self.download_engine.wake()
+            return
+        
+        while self._start_next_download():
+            pass
     
-    def abort(self):
+    def _start_engine_downloads(self):
         """
-        中止下载任务
+        使用asyncio下载引擎下载队列中的文件
         """
-        self.abort_flag = True
-
-class VersionDownloadManager:
-    """
-    版本下载管理器，用于管理版本下载任务
-    """
+        # 校验缓存位于缓存目录下，开始下载时才确定，不在创建下载管理器时获取
+        self.download_engine.verify_cache = self.api_client.verify_cache
+        thread = EngineDownloadThread(self.download_engine, self.download_queue)
+        thread.progress_updated.connect(self._on_progress_updated)
+        thread.task_completed.connect(self._on_engine_task_completed)
+        thread.all_completed.connect(self._on_engine_finished)
+        self.engine_thread = thread
+        thread.start()
     
-    def __init__(self, api_client: BMCLAPIClient):
+    def _on_engine_task_completed(self, task_id: str, success: bool, message: str):
         """
-        初始化下载管理器
+        下载引擎中单个任务完成回调
         
         Args:
-            api_client (BMCLAPIClient): API客户端实例
+            task_id (str): 任务ID
+            success (bool): 是否成功
+            message (str): 消息
         """
-        self.api_client = api_client
-        self.download_tasks = {}
-        self.max_concurrent_downloads = 3
-        self.active_downloads = 0
-        self.download_queue = []
-        self.lock = threading.RLock()
+        if not success:
+            logger.warning(f"下载任务{task_id}失败: {message}")
+        self._on_file_completed(task_id, success)
     
-    def download_version(self, version_id: str, dest_dir: str, callback=None):
+    def _on_engine_finished(self, success: bool, message: str):
         """
-        下载完整版本
+        下载引擎线程结束回调，引擎退出后才加入的文件由新的引擎线程下载
         
         Args:
-            version_id (str): 版本ID
-            dest_dir (str): 目标目录
-            callback: 完成回调函数
+            success (bool): 是否全部成功
+            message (str): 消息
         """
-        # 获取版本信息
-        version_info = self.api_client.get_version_info(version_id)
-        if not version_info:
-            if callback:
-                callback(False, "获取版本信息失败")
-            return
+        thread = self.engine_thread
+        self.engine_thread = None
+        if thread is not None:
+            thread.wait()
+        
+        if self.download_queue:
+            self._start_engine_downloads()
+    
+    def _on_file_completed(self, task_id: str, success: bool):
+        """
+        文件下载完成，更新所有需要该文件的下载任务
+        
+        Args:
+            task_id (str): 任务ID
+            success (bool): 是否成功
+        """
+        finished_jobs = []
+        with self.lock:
+            key, size = self.task_files.pop(task_id, (None, 0))
+            if key is None:
+                # 所属的下载任务已全部取消
+                return
+            self.file_tasks.pop(key, None)
+            self.progress.task_finished(task_id, success)
+            self.api_client.bandwidth.release(task_id)
+            
+            for job_id in self.file_owners.pop(key, set()):
+                job = self.jobs.get(job_id)
+                if job is None:
+                    continue
+                job.file_finished(key, size, success)
+                if job.finished:
+                    finished_jobs.append(self.jobs.pop(job_id))
+        
+        self._report_progress(self.progress.finished)
+        
+        for job in finished_jobs:
+            self.api_client.bandwidth.remove_job(job.job_id)
+            if job.failed_files:
+                logger.warning(f"下载任务{job.job_id}完成，{job.failed_files}个文件下载失败")
+                if job.callback:
+                    job.callback(False, f"{job.failed_files}个文件下载失败")
+            else:
+                logger.info(f"下载任务{job.job_id}完成，共{job.total_files}个文件")
+                if job.callback:
+                    job.callback(True, "下载完成")
+    
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        取消下载任务，其他任务仍需要的文件继续下载
+        
+        Args:
+            job_id (str): 下载任务ID
         
-        # 创建下载任务队列
-        tasks = [
-            (f"{version_id}_json", 
-             version_info["url"], 
-             os.path.join(dest_dir, f"versions/{version_id}/{version_id}.json")),
-            (f"{version_id}_client", 
-             f"{self.api_client.API_BASE_URL}/mc/game/{version_info['downloads']['client']['sha1']}/{version_info['downloads']['client']['url'].split('/')[-1]}", 
-             os.path.join(dest_dir, f"versions/{version_id}/{version_id}.jar"))
-        ]
-        
-        # 添加库文件下载任务
-        for lib in version_info.get("libraries", []):
-            downloads = lib.get("downloads", {})
-            artifact = downloads.get("artifact", {})
-            
-            if artifact:
-                url = artifact["url"]
-                task_id = f"{version_id}_lib_{artifact['path']}"
-                path = os.path.join(dest_dir, "libraries", artifact["path"])
+        Returns:
+            bool: 是否取消，任务不存在或已完成时返回False
+        """
+        with self.lock:
+            job = self.jobs.pop(job_id, None)
+            if job is None:
+                return False
+            job.cancelled = True
+            
+            for key in job.pending:
+                owners = self.file_owners.get(key)
+                if owners is None:
+                    continue
+                owners.discard(job_id)
+                if owners:
+                    continue
                 
-                # 使用BMCL API下载库文件
-                bmcl_url = f"{self.api_client.API_BASE_URL}/maven/{url.split('maven/')[-1]}"
-                tasks.append((task_id, bmcl_url, path))
+                # 没有其他任务需要该文件，从队列中移除或中止下载
+                del self.file_owners[key]
+                task_id = self.file_tasks.pop(key)
+                self.task_files.pop(task_id, None)
+                self.progress.remove_task(task_id)
+                self.api_client.bandwidth.release(task_id)
+                if self.download_queue.remove(task_id) is None:
+                    if self.download_engine:
+                        self.download_engine.cancel(task_id)
+                    elif task_id in self.download_tasks:
+                        self.download_tasks[task_id].abort()
         
-        # 启动下载
-        self._start_downloads(tasks, callback)
+        self.api_client.bandwidth.remove_job(job_id)
+        logger.info(f"已取消下载任务{job_id}")
+        self._report_progress(True)
+        if job.callback:
+            job.callback(False, "下载已取消")
+        return True
     
-    def _start_downloads(self, tasks: List[Tuple[str, str, str]], callback=None):
+    def get_job_status(self, job_id: str) -> Optional[Dict]:
         """
-        启动下载任务队列
+        获取下载任务的状态
         
         Args:
-            tasks (List[Tuple[str, str, str]]): 任务列表，每项为(task_id, url, dest_path)
-            callback: 完成回调函数
+            job_id (str): 下载任务ID
+        
+        Returns:
+            Optional[Dict]: 任务状态，任务不存在或已完成时返回None
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return job.get_status() if job else None
+    
+    def prioritize_version(self, version_id: str) -> int:
+        """
+        优先下载指定版本启动所需的文件，用于用户点击“立即启动”时
+        
+        客户端jar、库文件和本地库会排到资源文件之前；资源文件在多个版本间共享，
+        保持原有优先级。
+        
+        Args:
+            version_id (str): 版本ID
+        
+        Returns:
+            int: 提高了优先级的文件数量
         """
-        self.download_queue = tasks.copy()
+        def needed_by_version(item: DownloadItem) -> bool:
+            if item.kind == "asset":
+                return False
+            key = self.task_files.get(item.task_id, (None, 0))[0]
+            return any(
+                job_id in self.jobs and self.jobs[job_id].version_id == version_id
+                for job_id in self.file_owners.get(key, ())
+            )
         
-        # 启动初始下载
-        for _ in range(min(self.max_concurrent_downloads, len(self.download_queue))):
-            self._start_next_download()
+        count = self.download_queue.promote(needed_by_version)
+        if count:
+            if self.download_engine:
+                self.download_engine.wake()
+            logger.info(f"已优先下载版本{version_id}启动所需的{count}个文件")
+        return count
     
-    def _start_next_download(self):
+    def _start_next_download(self) -> bool:
         """
         启动下一个下载任务
+        
+        Returns:
+            bool: 是否启动了任务，队列为空或并发数已满时返回False
         """
         with self.lock:
-            if not self.download_queue or self.active_downloads >= self.max_concurrent_downloads:
-                return
+            # 从仍有空闲并发数的预算中取出优先级最高的任务
+            lanes = [
+                budget for budget in self.concurrency.budgets
+                if self.active_downloads.get(budget, 0) < self.concurrency.limit(budget)
+            ]
+            item = self.download_queue.pop(lanes)
+            if item is None:
+                return False
             
-            # 获取下一个任务
-            task_id, url, dest_path = self.download_queue.pop(0)
-            self.active_downloads += 1
+            budget = self.concurrency.budget_for(item.size)
+            self.active_downloads[budget] = self.active_downloads.get(budget, 0) + 1
+            self.download_started[item.task_id] = (budget, item.size)
         
         # 创建并启动下载任务
-        task = DownloadTask(task_id, url, dest_path)
+        task = DownloadTask(item.task_id, item.url, item.path, item.size, item.sha1,
+                            self.api_client.session, self.api_client.inflight, self.api_client.retry_policy,
+                            self.api_client.bandwidth, self.api_client.verify_cache, self.api_client.mirrors)
         task.progress_updated.connect(self._on_progress_updated)
         task.task_completed.connect(self._on_task_completed)
-        self.download_tasks[task_id] = task
+        self.download_tasks[item.task_id] = task
         task.start()
+        return True
     
     def _on_progress_updated(self, task_id: str, downloaded_size: int, total_size: int):
         """
@@ -429,8 +1820,8 @@ class VersionDownloadManager:
             downloaded_size (int): 已下载大小
             total_size (int): 总大小
         """
-        # 这里可以添加进度更新处理逻辑
-        pass
+        self.progress.update(task_id, downloaded_size, total_size)
+        self._report_progress()
     
     def _on_task_completed(self, task_id: str, success: bool, message: str):
         """
@@ -442,16 +1833,23 @@ class VersionDownloadManager:
             message (str): 消息
         """
         with self.lock:
-            self.active_downloads -= 1
-            
-            # 从任务列表中移除
-            if task_id in self.download_tasks:
-                del self.download_tasks[task_id]
+            budget, size = self.download_started.pop(task_id, (AdaptiveConcurrency.SMALL, 0))
+            self.active_downloads[budget] = max(0, self.active_downloads.get(budget, 0) - 1)
+            self.concurrency.record(budget, size if success else 0, success)
+            self.download_queue.task_done(task_id)
             
-            # 启动下一个任务
-            if self.download_queue:
-                self._start_next_download()
+            # 从任务列表中移除，完成信号在线程结束前发出，需等待线程退出后再释放
+            task = self.download_tasks.pop(task_id, None)
+            if task is not None:
+                task.wait()
+        
+        if not success:
+            logger.warning(f"下载任务{task_id}失败: {message}")
+        self._on_file_completed(task_id, success)
+        
+        # 启动下一个任务，并发数调高时可以同时启动多个
+        self._dispatch()
 
-# 创建全局API客户端实例
+# 创建全局API客户端实例，启动器各部分共用同一个客户端及其缓存
 bmcl_api_client = BMCLAPIClient()
 version_download_manager = VersionDownloadManager(bmcl_api_client)
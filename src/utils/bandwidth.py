@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+class TokenBucket:
+    """
+    令牌桶，按固定速率补充令牌，最多积累一秒的令牌
+    
+    取用令牌时允许暂时透支，返回需要等待的时间，使大块数据也能被正确限速。
+    """
+    
+    def __init__(self, rate: int = 0):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate (int): 速率（字节/秒），为0时不限速
+        """
+        self._lock = threading.Lock()
+        self.rate = 0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate)
+    
+    def _refill(self, now: float):
+        """
+        补充令牌，调用方需持有锁
+        
+        Args:
+            now (float): 当前时间
+        """
+        if self.rate:
+            self.tokens = min(float(self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def set_rate(self, rate: int):
+        """
+        设置速率，立即生效
+        
+        Args:
+            rate (int): 速率（字节/秒），为0时不限速
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(0, int(rate))
+            if not self.rate:
+                self.tokens = 0.0
+            else:
+                self.tokens = min(self.tokens, float(self.rate))
+    
+    def reserve(self, amount: int) -> float:
+        """
+        取用令牌
+        
+        Args:
+            amount (int): 字节数
+        
+        Returns:
+            float: 需要等待的时间（秒），不限速或令牌充足时为0
+        """
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class BandwidthLimiter:
+    """
+    下载带宽限制器，所有下载路径共用
+    
+    全局限速作用于所有下载，每个下载任务还可以单独限速；游戏运行时
+    自动将全局速率降到GAME_RUNNING_LIMIT，避免后台安装影响游戏联机。
+    所有限速都可以在下载过程中随时调整。
+    """
+    
+    # 游戏运行时的默认全局速率（字节/秒）
+    GAME_RUNNING_LIMIT = 1024 * 1024
+    
+    def __init__(self, global_limit: int = 0, game_running_limit: int = GAME_RUNNING_LIMIT):
+        """
+        初始化带宽限制器
+        
+        Args:
+            global_limit (int): 全局速率（字节/秒），为0时不限速
+            game_running_limit (int): 游戏运行时的全局速率（字节/秒），为0时游戏运行时也不额外限速
+        """
+        self.global_limit = max(0, global_limit)
+        self.game_running_limit = max(0, game_running_limit)
+        self.game_running = False
+        self._global = TokenBucket(global_limit)
+        self._jobs = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+    
+    def _update_global_rate(self):
+        """
+        根据全局限速和游戏运行状态计算实际的全局速率，调用方需持有锁
+        """
+        rate = self.global_limit
+        if self.game_running and self.game_running_limit:
+            rate = min(rate, self.game_running_limit) if rate else self.game_running_limit
+        self._global.set_rate(rate)
+    
+    def set_global_limit(self, rate: int):
+        """
+        设置全局速率
+        
+        Args:
+            rate (int): 速率（字节/秒），为0时不限速
+        """
+        with self._lock:
+            self.global_limit = max(0, rate)
+            self._update_global_rate()
+    
+    def set_game_running_limit(self, rate: int):
+        """
+        设置游戏运行时的全局速率
+        
+        Args:
+            rate (int): 速率（字节/秒），为0时游戏运行时也不额外限速
+        """
+        with self._lock:
+            self.game_running_limit = max(0, rate)
+            self._update_global_rate()
+    
+    def set_game_running(self, running: bool):
+        """
+        设置游戏是否正在运行，由游戏启动器在游戏启动和退出时调用
+        
+        Args:
+            running (bool): 游戏是否正在运行
+        """
+        with self._lock:
+            self.game_running = running
+            self._update_global_rate()
+    
+    def set_job_limit(self, job_id: str, rate: int):
+        """
+        设置单个下载任务的速率
+        
+        Args:
+            job_id (str): 下载任务ID
+            rate (int): 速率（字节/秒），为0时不限速
+        """
+        with self._lock:
+            if rate > 0:
+                if job_id in self._jobs:
+                    self._jobs[job_id].set_rate(rate)
+                else:
+                    self._jobs[job_id] = TokenBucket(rate)
+            else:
+                self._jobs.pop(job_id, None)
+    
+    def remove_job(self, job_id: str):
+        """
+        移除已结束的下载任务的限速
+        
+        Args:
+            job_id (str): 下载任务ID
+        """
+        self.set_job_limit(job_id, 0)
+    
+    def assign(self, task_id: str, job_id: str):
+        """
+        将文件的下载计入下载任务的限速
+        
+        Args:
+            task_id (str): 文件的任务ID
+            job_id (str): 下载任务ID
+        """
+        with self._lock:
+            self._tasks[task_id] = job_id
+    
+    def release(self, task_id: str):
+        """
+        文件下载结束，不再计入下载任务的限速
+        
+        Args:
+            task_id (str): 文件的任务ID
+        """
+        with self._lock:
+            self._tasks.pop(task_id, None)
+    
+    def reserve(self, amount: int, task_id: Optional[str] = None) -> float:
+        """
+        记录下载的字节数，返回为保持限速需要等待的时间
+        
+        Args:
+            amount (int): 字节数
+            task_id (Optional[str]): 文件的任务ID，为None时只计入全局限速
+        
+        Returns:
+            float: 需要等待的时间（秒）
+        """
+        with self._lock:
+            job_bucket = self._jobs.get(self._tasks.get(task_id)) if task_id is not None else None
+        delay = self._global.reserve(amount)
+        if job_bucket is not None:
+            delay = max(delay, job_bucket.reserve(amount))
+        return delay
+    
+    def throttle(self, amount: int, task_id: Optional[str] = None):
+        """
+        记录下载的字节数，超过限速时在当前线程中等待
+        
+        Args:
+            amount (int): 字节数
+            task_id (Optional[str]): 文件的任务ID
+        """
+        delay = self.reserve(amount, task_id)
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def throttle_async(self, amount: int, task_id: Optional[str] = None):
+        """
+        记录下载的字节数，超过限速时在事件循环中等待
+        
+        Args:
+            amount (int): 字节数
+            task_id (Optional[str]): 文件的任务ID
+        """
+        delay = self.reserve(amount, task_id)
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def get_limits(self) -> Dict:
+        """
+        获取当前的限速设置
+        
+        Returns:
+            Dict: 全局速率、实际全局速率、游戏运行状态和各下载任务的速率
+        """
+        with self._lock:
+            return {
+                "global_limit": self.global_limit,
+                "effective_global_limit": self._global.rate,
+                "game_running": self.game_running,
+                "game_running_limit": self.game_running_limit,
+                "job_limits": {job_id: bucket.rate for job_id, bucket in self._jobs.items()}
+            }
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import threading
+
+class BufferPool:
+    """
+    可重复使用的读取缓冲区池
+    
+    下载时用readinto将网络数据直接读入预先分配的缓冲区，避免每个数据块
+    都创建新的bytes对象；缓冲区在下载之间复用，不会随文件数量增长。
+    """
+    
+    def __init__(self, buffer_size: int = 256 * 1024, max_buffers: int = 32):
+        """
+        初始化缓冲区池
+        
+        Args:
+            buffer_size (int): 每个缓冲区的大小
+            max_buffers (int): 最多保留的空闲缓冲区数量
+        """
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self._free = []
+        self._lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def buffer(self):
+        """
+        借用一个缓冲区，使用完毕后自动归还
+        
+        Yields:
+            memoryview: 缓冲区
+        """
+        with self._lock:
+            data = self._free.pop() if self._free else None
+        if data is None:
+            data = bytearray(self.buffer_size)
+        
+        try:
+            yield memoryview(data)
+        finally:
+            with self._lock:
+                if len(self._free) < self.max_buffers:
+                    self._free.append(data)
+
+# 全局缓冲区池
+buffer_pool = BufferPool()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from typing import Dict, Optional
+
+from ..utils.logger import logger
+
+class ConcurrencyBudget:
+    """
+    一类下载任务的并发预算，按AIMD方式调整并发数
+    
+    每完成一个统计窗口的下载后评估一次：错误率或延迟过高时并发数减半，
+    吞吐量没有下降时并发数加一，吞吐量下降时并发数减一。
+    """
+    
+    # 错误率超过该值时减半并发数
+    MAX_ERROR_RATE = 0.1
+    
+    # 延迟超过基准延迟的倍数时减半并发数
+    LATENCY_TOLERANCE = 2.0
+    
+    # 吞吐量不低于上一窗口的该比例时视为没有下降
+    THROUGHPUT_TOLERANCE = 0.9
+    
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int):
+        """
+        初始化并发预算
+        
+        Args:
+            name (str): 预算名称
+            initial (int): 初始并发数
+            minimum (int): 最小并发数
+            maximum (int): 最大并发数
+        """
+        self.name = name
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.last_throughput = 0.0
+        self.base_latency = None
+        self._reset_window()
+    
+    def _reset_window(self):
+        """
+        开始新的统计窗口
+        """
+        self.window_start = time.monotonic()
+        self.window_bytes = 0
+        self.window_samples = 0
+        self.window_failures = 0
+        self.window_latency = 0.0
+        self.window_latency_samples = 0
+    
+    def record(self, transferred: int, success: bool, latency: Optional[float] = None):
+        """
+        记录一次下载结果，窗口结束时调整并发数
+        
+        Args:
+            transferred (int): 本次传输的字节数
+            success (bool): 是否成功
+            latency (Optional[float]): 收到响应头的耗时（秒），未知时为None
+        """
+        self.window_bytes += transferred
+        self.window_samples += 1
+        if not success:
+            self.window_failures += 1
+        if latency is not None:
+            self.window_latency += latency
+            self.window_latency_samples += 1
+        
+        # 窗口大小随并发数增长，保证每个窗口都能反映当前并发数下的表现
+        if self.window_samples >= max(self.limit, 4):
+            self._adjust()
+    
+    def _adjust(self):
+        """
+        根据窗口内的吞吐量、错误率和延迟调整并发数
+        """
+        elapsed = max(time.monotonic() - self.window_start, 1e-6)
+        throughput = self.window_bytes / elapsed
+        error_rate = self.window_failures / self.window_samples
+        latency = None
+        if self.window_latency_samples:
+            latency = self.window_latency / self.window_latency_samples
+            if self.base_latency is None or latency < self.base_latency:
+                self.base_latency = latency
+        
+        old_limit = self.limit
+        if error_rate > self.MAX_ERROR_RATE or (
+                latency is not None and latency > self.base_latency * self.LATENCY_TOLERANCE):
+            # 乘性减少
+            self.limit = max(self.minimum, self.limit // 2)
+        elif throughput >= self.last_throughput * self.THROUGHPUT_TOLERANCE:
+            # 加性增加
+            self.limit = min(self.maximum, self.limit + 1)
+        else:
+            self.limit = max(self.minimum, self.limit - 1)
+        
+        if self.limit != old_limit:
+            logger.debug(f"{self.name}并发数调整为{self.limit} (吞吐量{throughput / 1024:.0f}KB/s，错误率{error_rate:.0%})")
+        
+        self.last_throughput = throughput
+        self._reset_window()
+
+class AdaptiveConcurrency:
+    """
+    自适应并发控制器
+    
+    小文件（资源对象、大部分库）和大文件（客户端jar等）使用不同的并发预算：
+    小文件受请求延迟限制，需要较高的并发数；大文件受带宽限制，少量连接即可占满带宽。
+    """
+    
+    # 小于该大小的文件使用小文件预算，大小未知的文件也视为小文件
+    SMALL_FILE_THRESHOLD = 1024 * 1024
+    
+    SMALL = "small"
+    LARGE = "large"
+    
+    def __init__(self, small_limits: tuple = (8, 2, 32), large_limits: tuple = (2, 1, 8)):
+        """
+        初始化自适应并发控制器
+        
+        Args:
+            small_limits (tuple): 小文件预算的(初始, 最小, 最大)并发数
+            large_limits (tuple): 大文件预算的(初始, 最小, 最大)并发数
+        """
+        self.budgets = {
+            self.SMALL: ConcurrencyBudget(self.SMALL, *small_limits),
+            self.LARGE: ConcurrencyBudget(self.LARGE, *large_limits)
+        }
+        self._lock = threading.Lock()
+    
+    def budget_for(self, size: int) -> str:
+        """
+        获取文件所属的并发预算
+        
+        Args:
+            size (int): 文件大小，未知时为0
+        
+        Returns:
+            str: 预算名称
+        """
+        return self.LARGE if size >= self.SMALL_FILE_THRESHOLD else self.SMALL
+    
+    def limit(self, budget: str) -> int:
+        """
+        获取预算当前的并发数
+        
+        Args:
+            budget (str): 预算名称
+        
+        Returns:
+            int: 并发数
+        """
+        with self._lock:
+            return self.budgets[budget].limit
+    
+    def total_limit(self) -> int:
+        """
+        获取所有预算的并发数之和
+        
+        Returns:
+            int: 并发数
+        """
+        with self._lock:
+            return sum(budget.limit for budget in self.budgets.values())
+    
+    def record(self, budget: str, transferred: int, success: bool, latency: Optional[float] = None):
+        """
+        记录一次下载结果
+        
+        Args:
+            budget (str): 预算名称
+            transferred (int): 本次传输的字节数
+            success (bool): 是否成功
+            latency (Optional[float]): 收到响应头的耗时（秒），未知时为None
+        """
+        with self._lock:
+            self.budgets[budget].record(transferred, success, latency)
+    
+    def get_limits(self) -> Dict[str, int]:
+        """
+        获取所有预算当前的并发数
+        
+        Returns:
+            Dict[str, int]: 预算名称到并发数的映射
+        """
+        with self._lock:
+            return {name: budget.limit for name, budget in self.budgets.items()}
@@ -0,0 +1,457 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+from ..utils.install_plan import DownloadItem
+from ..utils.partial_download import PartialDownload
+from ..utils.mirrors import MirrorRegistry
+from ..utils.concurrency import AdaptiveConcurrency
+from ..utils.download_queue import DownloadQueue
+from ..utils.inflight import InFlightRegistry
+from ..utils.retry import RetryPolicy
+from ..utils.bandwidth import BandwidthLimiter
+from ..utils.verify_cache import FileVerifyCache
+
+class AsyncDownloadEngine:
+    """
+    基于asyncio的下载引擎，通过连接池复用HTTP连接并发下载大量文件
+    """
+    
+    # 默认请求头
+    DEFAULT_HEADERS = {
+        "User-Agent": "TMCL Launcher"
+    }
+    
+    def __init__(self, max_concurrency: int = 32, per_host_limit: int = 16,
+                 timeout: float = 30.0, chunk_size: int = 64 * 1024,
+                 mirrors: Optional[MirrorRegistry] = None,
+                 concurrency: Optional[AdaptiveConcurrency] = None,
+                 inflight: Optional[InFlightRegistry] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 bandwidth: Optional[BandwidthLimiter] = None,
+                 verify_cache: Optional[FileVerifyCache] = None,
+                 http2: bool = False, http1: bool = True):
+        """
+        初始化下载引擎
+        
+        Args:
+            max_concurrency (int): 全局最大并发下载数，使用自适应并发时为并发数上限
+            per_host_limit (int): 单个主机的最大并发下载数
+            timeout (float): 网络超时时间（秒）
+            chunk_size (int): 读取块大小
+            mirrors (Optional[MirrorRegistry]): 镜像注册表，为None时直接使用下载项的地址
+            concurrency (Optional[AdaptiveConcurrency]): 自适应并发控制器，为None时使用固定的max_concurrency
+            inflight (Optional[InFlightRegistry]): 正在进行的下载登记表，为None时只在本引擎内合并重复的下载
+            retry_policy (Optional[RetryPolicy]): 重试策略，为None时使用默认策略
+            bandwidth (Optional[BandwidthLimiter]): 带宽限制器，为None时不限速
+            verify_cache (Optional[FileVerifyCache]): 文件校验缓存，下载完成后记录边下载边计算的sha1
+            http2 (bool): 是否启用HTTP/2，支持的服务器上同一主机的大量小文件在少数连接上多路复用；
+                未安装h2时忽略
+            http1 (bool): 是否允许HTTP/1.1，为False时对http地址直接使用HTTP/2（h2c），仅用于本地测试
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.mirrors = mirrors
+        self.concurrency = concurrency
+        self.inflight = inflight or InFlightRegistry()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.bandwidth = bandwidth
+        self.verify_cache = verify_cache
+        self.http2 = http2 and self.is_http2_available()
+        self.http1 = http1 or not self.http2
+        self.abort_flag = False
+        self.cancelled = set()
+        # 正在下载的任务ID，只有这些任务可以被取消，避免取消已结束的任务影响之后同ID的下载
+        self.downloading = set()
+        self._lock = threading.Lock()
+        # 唤醒正在运行的调度循环的函数，只在download_all运行期间有效
+        self._wakeup = None
+    
+    @staticmethod
+    def is_available() -> bool:
+        """
+        检查下载引擎的依赖是否可用
+        
+        Returns:
+            bool: 是否可用
+        """
+        return httpx is not None
+    
+    @staticmethod
+    def is_http2_available() -> bool:
+        """
+        检查HTTP/2的依赖是否可用
+        
+        Returns:
+            bool: 是否可用
+        """
+        return httpx is not None and h2 is not None
+    
+    def set_limits(self, max_concurrency: Optional[int] = None, per_host_limit: Optional[int] = None):
+        """
+        设置并发限制，在下一次下载时生效
+        
+        Args:
+            max_concurrency (Optional[int]): 全局最大并发下载数
+            per_host_limit (Optional[int]): 单个主机的最大并发下载数
+        """
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, max_concurrency)
+        if per_host_limit is not None:
+            self.per_host_limit = max(1, per_host_limit)
+    
+    def abort(self):
+        """
+        中止当前所有下载
+        """
+        self.abort_flag = True
+    
+    def cancel(self, task_id: str):
+        """
+        中止单个正在进行的下载
+        
+        Args:
+            task_id (str): 任务ID
+        """
+        with self._lock:
+            if task_id in self.downloading:
+                self.cancelled.add(task_id)
+    
+    def wake(self):
+        """
+        唤醒正在运行的调度循环，使其立即检查队列中新加入或提高了优先级的文件，
+        以及并发数调整后空闲出的位置；可以在任意线程中调用，没有在下载时不做任何事
+        """
+        with self._lock:
+            if self._wakeup is not None:
+                self._wakeup()
+    
+    def _is_cancelled(self, item: DownloadItem) -> bool:
+        """
+        判断下载项是否已被取消
+        
+        Args:
+            item (DownloadItem): 下载项
+        
+        Returns:
+            bool: 是否已取消
+        """
+        return self.abort_flag or item.task_id in self.cancelled
+    
+    def run(self, items: Union[List[DownloadItem], DownloadQueue], progress_callback: Optional[Callable] = None,
+            completed_callback: Optional[Callable] = None) -> Dict[str, bool]:
+        """
+        在当前线程中运行事件循环并下载全部文件，下载完成后返回
+        
+        Args:
+            items (Union[List[DownloadItem], DownloadQueue]): 下载项列表或下载队列
+            progress_callback (Optional[Callable]): 进度回调 (task_id, downloaded_size, total_size)
+            completed_callback (Optional[Callable]): 单个文件完成回调 (task_id, success, message)
+        
+        Returns:
+            Dict[str, bool]: 每个任务ID对应的下载结果
+        """
+        self.abort_flag = False
+        return asyncio.run(self.download_all(items, progress_callback, completed_callback))
+    
+    def _lane(self, item: DownloadItem) -> str:
+        """
+        获取下载项所属的并发预算
+        
+        Args:
+            item (DownloadItem): 下载项
+        
+        Returns:
+            str: 预算名称，没有自适应并发控制器时为空
+        """
+        return self.concurrency.budget_for(item.size) if self.concurrency else ""
+    
+    async def download_all(self, items: Union[List[DownloadItem], DownloadQueue],
+                           progress_callback: Optional[Callable] = None,
+                           completed_callback: Optional[Callable] = None) -> Dict[str, bool]:
+        """
+        并发下载全部文件，按下载队列的优先级依次开始
+        
+        Args:
+            items (Union[List[DownloadItem], DownloadQueue]): 下载项列表或下载队列，
+                传入队列时下载过程中可以调整队列中文件的优先级
+            progress_callback (Optional[Callable]): 进度回调 (task_id, downloaded_size, total_size)
+            completed_callback (Optional[Callable]): 单个文件完成回调 (task_id, success, message)
+        
+        Returns:
+            Dict[str, bool]: 每个任务ID对应的下载结果
+        """
+        queue = items if isinstance(items, DownloadQueue) else DownloadQueue(items, self._lane)
+        results = {}
+        host_semaphores = {}
+        
+        # 每个并发预算中正在下载的任务数，并发数随自适应控制器的调整而变化；
+        # 文件在取得主机的连接名额后才计入，使自适应控制器的采样反映实际同时进行的下载数
+        active = {}
+        # 已取出但还在等待主机连接名额的文件数
+        waiting = 0
+        gate = asyncio.Condition()
+        loop = asyncio.get_running_loop()
+        
+        notifications = set()
+        
+        async def notify():
+            async with gate:
+                gate.notify_all()
+        
+        def schedule_notify():
+            task = loop.create_task(notify())
+            notifications.add(task)
+            task.add_done_callback(notifications.discard)
+        
+        # 其他线程向共享队列加入文件后通过wake()唤醒调度循环，否则要等到某个下载结束才会取出新文件
+        with self._lock:
+            self._wakeup = lambda: loop.call_soon_threadsafe(schedule_notify)
+        
+        def available_lanes() -> Optional[List[str]]:
+            # 有文件在等待主机的连接名额时说明该主机已满，暂不取出更多文件，
+            # 使它们留在队列中，仍可以被调整优先级或让给其他任务
+            if waiting or sum(active.values()) >= self.max_concurrency:
+                return []
+            if self.concurrency is None:
+                return None
+            return [
+                budget for budget in self.concurrency.budgets
+                if active.get(budget, 0) < self.concurrency.limit(budget)
+            ]
+        
+        # 连接池大小与并发数一致，保持长连接以避免重复的TCP/TLS握手；
+        # 启用HTTP/2时同一主机的请求在一个连接上多路复用，通常只会建立少数连接
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency
+        )
+        
+        async with httpx.AsyncClient(headers=self.DEFAULT_HEADERS, limits=limits, timeout=self.timeout,
+                                     follow_redirects=True, http1=self.http1, http2=self.http2) as client:
+            async def worker(item: DownloadItem):
+                nonlocal waiting
+                budget = self._lane(item)
+                host = httpx.URL(self._candidate_urls(item.url)[0][1]).host
+                if host not in host_semaphores:
+                    host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+                
+                started = False
+                try:
+                    async with host_semaphores[host]:
+                        async with gate:
+                            waiting -= 1
+                            active[budget] = active.get(budget, 0) + 1
+                            started = True
+                            gate.notify_all()
+                        success, message = await self._download_item(client, item, progress_callback)
+                finally:
+                    queue.task_done(item.task_id)
+                    with self._lock:
+                        self.downloading.discard(item.task_id)
+                        self.cancelled.discard(item.task_id)
+                    async with gate:
+                        if started:
+                            active[budget] -= 1
+                        else:
+                            waiting -= 1
+                        gate.notify_all()
+                
+                results[item.task_id] = success
+                if completed_callback:
+                    completed_callback(item.task_id, success, message)
+            
+            # 每当有空闲并发数时从队列中取出优先级最高的文件开始下载
+            workers = []
+            try:
+                async with gate:
+                    while queue or waiting or sum(active.values()):
+                        # 取出文件和登记为下载中需在同一个锁内完成，使其他线程中的cancel不会遗漏该文件
+                        with self._lock:
+                            item = queue.pop(available_lanes()) if queue else None
+                            if item is not None:
+                                self.downloading.add(item.task_id)
+                        if item is None:
+                            await gate.wait()
+                            continue
+                        
+                        waiting += 1
+                        workers.append(asyncio.ensure_future(worker(item)))
+            finally:
+                with self._lock:
+                    self._wakeup = None
+            
+            await asyncio.gather(*workers)
+        
+        return results
+    
+    def _candidate_urls(self, url: str) -> List[Tuple]:
+        """
+        获取下载地址的候选镜像地址
+        
+        Args:
+            url (str): 官方下载地址
+        
+        Returns:
+            List[Tuple]: (镜像, 镜像地址)列表，没有镜像注册表时镜像为None
+        """
+        if self.mirrors is None:
+            return [(None, url)]
+        return self.mirrors.candidate_urls(url)
+    
+    def _record(self, item: DownloadItem, transferred: int, success: bool, latency: Optional[float]):
+        """
+        向自适应并发控制器报告一次下载结果
+        
+        Args:
+            item (DownloadItem): 下载项
+            transferred (int): 本次传输的字节数
+            success (bool): 是否成功
+            latency (Optional[float]): 收到响应头的耗时（秒）
+        """
+        if self.concurrency is not None:
+            self.concurrency.record(self.concurrency.budget_for(item.size), transferred, success, latency)
+            # 并发数可能已经提高，让调度循环检查是否可以开始新的下载
+            self.wake()
+    
+    async def _download_item(self, client, item: DownloadItem,
+                             progress_callback: Optional[Callable] = None):
+        """
+        下载单个文件，同一文件正在由其他任务下载时等待其完成
+        
+        Args:
+            client (httpx.AsyncClient): HTTP客户端
+            item (DownloadItem): 下载项
+            progress_callback (Optional[Callable]): 进度回调
+        
+        Returns:
+            Tuple[bool, str]: 是否成功以及结果消息
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            transfer, owner = self.inflight.begin(item.path, item.sha1, item.size)
+            if owner:
+                break
+            
+            # 其他任务（可能在另一个线程中）正在下载该路径，在线程池中等待以免阻塞事件循环
+            success = await loop.run_in_executor(None, transfer.wait)
+            if transfer.matches((item.sha1 or "").lower()):
+                return success, "下载成功" if success else "下载失败: 合并的下载失败"
+        
+        success = False
+        try:
+            success, message = await self._transfer_item(client, item, progress_callback)
+            return success, message
+        finally:
+            self.inflight.finish(transfer, success)
+    
+    async def _transfer_item(self, client, item: DownloadItem,
+                             progress_callback: Optional[Callable] = None):
+        """
+        传输单个文件，写入可续传的部分下载文件，完成后再重命名为目标文件
+        
+        Args:
+            client (httpx.AsyncClient): HTTP客户端
+            item (DownloadItem): 下载项
+            progress_callback (Optional[Callable]): 进度回调
+        
+        Returns:
+            Tuple[bool, str]: 是否成功以及结果消息
+        """
+        if self._is_cancelled(item):
+            return False, "下载已取消"
+        
+        partial = PartialDownload(item.path, item.url, item.size, item.sha1)
+        try:
+            # 打开部分下载文件，确定续传位置
+            partial.open()
+            
+            # 所有镜像都遇到临时性错误时等待后重试，已下载的部分继续保留
+            completed = await self.retry_policy.call_async(
+                lambda: self._fetch_item(client, item, partial, progress_callback),
+                f"下载{item.url}", lambda: self._is_cancelled(item)
+            )
+            if not completed:
+                # 保留已下载的部分，下次下载时续传
+                partial.close()
+                return False, "下载已取消"
+            return True, "下载成功"
+        except Exception as e:
+            # 保留已下载的部分，下次下载时续传
+            partial.close()
+            return False, f"下载失败: {str(e)}"
+    
+    async def _fetch_item(self, client, item: DownloadItem, partial: PartialDownload,
+                          progress_callback: Optional[Callable] = None) -> bool:
+        """
+        按镜像优先级尝试下载一次，失败时从已下载的位置切换到下一个镜像继续
+        
+        Args:
+            client (httpx.AsyncClient): HTTP客户端
+            item (DownloadItem): 下载项
+            partial (PartialDownload): 部分下载文件
+            progress_callback (Optional[Callable]): 进度回调
+        
+        Returns:
+            bool: 是否下载完成，被取消时返回False
+        
+        Raises:
+            Exception: 所有镜像都下载失败
+        """
+        async def fetch(url: str):
+            start = time.monotonic()
+            start_offset = partial.bytes_written
+            latency = None
+            try:
+                async with client.stream("GET", url, headers=partial.range_headers()) as response:
+                    offset = partial.accept_status(response.status_code)
+                    response.raise_for_status()
+                    latency = time.monotonic() - start
+                    total_size = item.size or offset + int(response.headers.get("content-length", 0))
+                    partial.preallocate(total_size)
+                    
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        if self._is_cancelled(item):
+                            break
+                        partial.write(chunk)
+                        if self.bandwidth is not None:
+                            await self.bandwidth.throttle_async(len(chunk), item.task_id)
+                        if progress_callback:
+                            progress_callback(item.task_id, partial.bytes_written, total_size)
+                
+                if self._is_cancelled(item):
+                    return False, None
+                
+                partial.commit()
+            except Exception:
+                self._record(item, max(0, partial.bytes_written - start_offset), False, latency)
+                raise
+            
+            self._record(item, partial.bytes_written - start_offset, True, latency)
+            return True, latency
+        
+        if self.mirrors is None:
+            completed, _ = await fetch(item.url)
+        else:
+            completed = await self.mirrors.call_async(item.url, fetch, self.retry_policy.is_transient, "下载",
+                                                      lambda: self._is_cancelled(item))
+        
+        if completed and self.verify_cache is not None:
+            self.verify_cache.record_file(item.path, partial.hexdigest())
+        return completed
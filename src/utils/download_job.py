@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+from typing import Callable, Dict, Optional
+
+class DownloadJob:
+    """
+    下载任务，对应一次版本安装或修复
+    
+    多个任务共享同一个下载调度器；不同任务需要的同一个文件只下载一次，
+    完成后同时计入所有需要它的任务。
+    """
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, version_id: str, callback: Optional[Callable] = None):
+        """
+        初始化下载任务
+        
+        Args:
+            version_id (str): 版本ID
+            callback (Optional[Callable]): 完成回调 (success, message)
+        """
+        self.job_id = f"{version_id}#{next(self._ids)}"
+        self.version_id = version_id
+        self.callback = callback
+        self.pending = set()
+        self.total_files = 0
+        self.completed_files = 0
+        self.failed_files = 0
+        self.total_bytes = 0
+        self.completed_bytes = 0
+        self.cancelled = False
+        
+        # 正在后台确定需要下载的文件，尚未加入下载队列
+        self.preparing = False
+    
+    def add_file(self, key: str, size: int):
+        """
+        记录任务需要的文件
+        
+        Args:
+            key (str): 文件键（目标路径）
+            size (int): 文件大小，未知时为0
+        """
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        self.total_files += 1
+        self.total_bytes += size
+    
+    def file_finished(self, key: str, size: int, success: bool):
+        """
+        记录文件下载完成
+        
+        Args:
+            key (str): 文件键（目标路径）
+            size (int): 文件大小
+            success (bool): 是否成功
+        """
+        if key not in self.pending:
+            return
+        self.pending.discard(key)
+        if success:
+            self.completed_files += 1
+            self.completed_bytes += size
+        else:
+            self.failed_files += 1
+    
+    @property
+    def finished(self) -> bool:
+        """
+        任务中的文件是否都已处理完
+        """
+        return not self.pending
+    
+    def get_status(self) -> Dict:
+        """
+        获取任务状态
+        
+        Returns:
+            Dict: 任务状态
+        """
+        return {
+            "job_id": self.job_id,
+            "version_id": self.version_id,
+            "total_files": self.total_files,
+            "completed_files": self.completed_files,
+            "failed_files": self.failed_files,
+            "total_bytes": self.total_bytes,
+            "completed_bytes": self.completed_bytes,
+            "cancelled": self.cancelled,
+            "preparing": self.preparing
+        }
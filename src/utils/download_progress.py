@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+import time
+from typing import Dict, Optional
+
+class DownloadProgress:
+    """
+    汇总的下载进度，统计所有下载中文件的字节数、文件数、下载速度和剩余时间
+    
+    每次更新只按增量调整总数，不需要遍历所有文件；poll按固定的时间间隔返回快照，
+    避免成千上万个文件的进度更新刷屏界面。
+    """
+    
+    # 两次向界面报告进度的最小间隔（秒）
+    EMIT_INTERVAL = 0.2
+    
+    # 计算下载速度的时间窗口（秒）
+    SPEED_WINDOW = 5.0
+    
+    def __init__(self):
+        """
+        初始化下载进度
+        """
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """
+        清空统计，开始新一轮下载
+        """
+        with self._lock:
+            self._tasks = {}
+            self.total_files = 0
+            self.completed_files = 0
+            self.failed_files = 0
+            self.total_bytes = 0
+            self.downloaded_bytes = 0
+            self._samples = collections.deque()
+            self._last_emit = 0.0
+    
+    def add_task(self, task_id: str, size: int):
+        """
+        加入一个待下载的文件
+        
+        Args:
+            task_id (str): 任务ID
+            size (int): 文件大小，未知时为0
+        """
+        with self._lock:
+            if task_id in self._tasks:
+                return
+            # 每个任务记录[已下载字节数, 总字节数]
+            self._tasks[task_id] = [0, size]
+            self.total_files += 1
+            self.total_bytes += size
+    
+    def update(self, task_id: str, downloaded_size: int, total_size: int):
+        """
+        更新单个文件的下载进度
+        
+        Args:
+            task_id (str): 任务ID
+            downloaded_size (int): 已下载大小
+            total_size (int): 总大小，未知时为0
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            if not task[1] and total_size > 0:
+                # 开始下载后才知道大小的文件
+                task[1] = total_size
+                self.total_bytes += total_size
+            self.downloaded_bytes += downloaded_size - task[0]
+            task[0] = downloaded_size
+    
+    def task_finished(self, task_id: str, success: bool):
+        """
+        记录文件下载完成；失败的文件不再计入已下载字节数
+        
+        Args:
+            task_id (str): 任务ID
+            success (bool): 是否成功
+        """
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return
+            if success:
+                self.completed_files += 1
+                if not task[1]:
+                    # 直到完成都不知道大小的文件，以实际下载的字节数为准
+                    task[1] = task[0]
+                    self.total_bytes += task[0]
+                self.downloaded_bytes += task[1] - task[0]
+            else:
+                self.failed_files += 1
+                self.downloaded_bytes -= task[0]
+    
+    def remove_task(self, task_id: str):
+        """
+        移除已取消的文件
+        
+        Args:
+            task_id (str): 任务ID
+        """
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return
+            self.total_files -= 1
+            self.total_bytes -= task[1]
+            self.downloaded_bytes -= task[0]
+    
+    @property
+    def finished(self) -> bool:
+        """
+        所有文件是否都已处理完
+        """
+        with self._lock:
+            return not self._tasks
+    
+    def _speed(self, now: float) -> float:
+        """
+        根据时间窗口内的采样计算下载速度，调用方需持有锁
+        
+        Args:
+            now (float): 当前时间
+        
+        Returns:
+            float: 下载速度（字节/秒）
+        """
+        self._samples.append((now, self.downloaded_bytes))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.SPEED_WINDOW:
+            self._samples.popleft()
+        
+        start, start_bytes = self._samples[0]
+        if now - start <= 0:
+            return 0.0
+        return max(0.0, (self.downloaded_bytes - start_bytes) / (now - start))
+    
+    def snapshot(self) -> Dict:
+        """
+        获取当前进度
+        
+        Returns:
+            Dict: 文件数、字节数、进度百分比、下载速度（字节/秒）和预计剩余时间（秒，未知时为None）
+        """
+        with self._lock:
+            return self._snapshot(time.monotonic())
+    
+    def _snapshot(self, now: float) -> Dict:
+        """
+        获取当前进度，调用方需持有锁
+        
+        Args:
+            now (float): 当前时间
+        
+        Returns:
+            Dict: 当前进度
+        """
+        speed = self._speed(now)
+        remaining = max(0, self.total_bytes - self.downloaded_bytes)
+        eta = None
+        if not self._tasks:
+            eta = 0.0
+        elif speed > 0:
+            eta = remaining / speed
+        
+        percent = 100.0
+        if self.total_bytes:
+            percent = min(100.0, self.downloaded_bytes * 100.0 / self.total_bytes)
+        elif self.total_files:
+            percent = (self.completed_files + self.failed_files) * 100.0 / self.total_files
+        
+        return {
+            "total_files": self.total_files,
+            "completed_files": self.completed_files,
+            "failed_files": self.failed_files,
+            "total_bytes": self.total_bytes,
+            "downloaded_bytes": self.downloaded_bytes,
+            "percent": percent,
+            "speed": speed,
+            "eta": eta
+        }
+    
+    def poll(self, force: bool = False) -> Optional[Dict]:
+        """
+        距上次报告超过EMIT_INTERVAL时返回当前进度
+        
+        Args:
+            force (bool): 是否忽略时间间隔，例如全部下载完成时
+        
+        Returns:
+            Optional[Dict]: 当前进度，未到报告时间时返回None
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_emit < self.EMIT_INTERVAL:
+                return None
+            self._last_emit = now
+            return self._snapshot(now)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import threading
+from typing import Callable, Iterable, List, Optional
+
+from ..utils.install_plan import DownloadItem
+
+class DownloadQueue:
+    """
+    按优先级排列的下载队列
+    
+    优先级高的文件先下载，同一优先级中大文件先下载，避免最后只剩一个大文件
+    在下载而拖长总耗时。队列按通道（如小文件/大文件并发预算）分别建堆，
+    取出时可以只从仍有空闲并发数的通道中选择。
+    
+    下载项可以按分组（如安装任务）加入，取出时优先选择正在下载的文件最少的分组，
+    使多个同时进行的安装平分并发数；NEEDED优先级的文件不受分组公平性限制。
+    """
+    
+    # 优先级，数值越小越先下载
+    NEEDED = 0      # 立即启动游戏所需的文件
+    CLIENT = 1      # 客户端jar
+    LIBRARY = 2     # 库文件和本地库
+    ASSET = 3       # 资源文件
+    OPTIONAL = 4    # 其他可选文件
+    
+    # 文件类型对应的默认优先级
+    KIND_PRIORITIES = {
+        "client": CLIENT,
+        "library": LIBRARY,
+        "native": LIBRARY,
+        "asset_index": LIBRARY,
+        "asset": ASSET
+    }
+    
+    def __init__(self, items: Optional[Iterable[DownloadItem]] = None,
+                 lane: Optional[Callable[[DownloadItem], str]] = None):
+        """
+        初始化下载队列
+        
+        Args:
+            items (Optional[Iterable[DownloadItem]]): 初始下载项
+            lane (Optional[Callable[[DownloadItem], str]]): 计算下载项所属通道的函数，为None时只有一个通道
+        """
+        self._lane = lane or (lambda item: "")
+        self._heaps = {}
+        self._entries = {}
+        self._group_active = {}
+        self._in_flight = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        if items:
+            self.extend(items)
+    
+    def _push_entry(self, item: DownloadItem, priority: int, group: str):
+        """
+        将下载项加入对应通道和分组的堆
+        
+        Args:
+            item (DownloadItem): 下载项
+            priority (int): 优先级
+            group (str): 分组
+        """
+        # 堆中的条目为[优先级, -大小, 序号, 下载项, 通道, 分组]，下载项为None表示已删除
+        lane = self._lane(item)
+        entry = [priority, -(item.size or 0), next(self._counter), item, lane, group]
+        self._entries[item.task_id] = entry
+        heapq.heappush(self._heaps.setdefault((lane, group), []), entry)
+    
+    def push(self, item: DownloadItem, priority: Optional[int] = None, group: str = "") -> bool:
+        """
+        加入下载项
+        
+        Args:
+            item (DownloadItem): 下载项
+            priority (Optional[int]): 优先级，默认根据文件类型决定
+            group (str): 分组
+        
+        Returns:
+            bool: 是否加入，队列中已有相同任务ID时返回False
+        """
+        if priority is None:
+            priority = self.KIND_PRIORITIES.get(item.kind, self.OPTIONAL)
+        
+        with self._lock:
+            if item.task_id in self._entries:
+                return False
+            self._push_entry(item, priority, group)
+            return True
+    
+    def extend(self, items: Iterable[DownloadItem], group: str = ""):
+        """
+        批量加入下载项
+        
+        Args:
+            items (Iterable[DownloadItem]): 下载项
+            group (str): 分组
+        """
+        for item in items:
+            self.push(item, group=group)
+    
+    def pop(self, lanes: Optional[Iterable[str]] = None) -> Optional[DownloadItem]:
+        """
+        取出优先级最高的下载项
+        
+        Args:
+            lanes (Optional[Iterable[str]]): 允许取出的通道，为None时不限制
+        
+        Returns:
+            Optional[DownloadItem]: 下载项，允许的通道中没有下载项时返回None
+        """
+        with self._lock:
+            allowed = None if lanes is None else set(lanes)
+            best_heap = None
+            best_key = None
+            for (lane, group), heap in self._heaps.items():
+                if allowed is not None and lane not in allowed:
+                    continue
+                # 跳过已删除的条目
+                while heap and heap[0][3] is None:
+                    heapq.heappop(heap)
+                if not heap:
+                    continue
+                
+                # 先比较是否急需，再比较分组正在下载的文件数，最后比较优先级和大小
+                head = heap[0]
+                key = (head[0] != self.NEEDED, self._group_active.get(group, 0), head[:3])
+                if best_key is None or key < best_key:
+                    best_heap = heap
+                    best_key = key
+            
+            if best_heap is None:
+                return None
+            
+            entry = heapq.heappop(best_heap)
+            item, group = entry[3], entry[5]
+            del self._entries[item.task_id]
+            self._group_active[group] = self._group_active.get(group, 0) + 1
+            self._in_flight[item.task_id] = group
+            return item
+    
+    def task_done(self, task_id: str):
+        """
+        标记取出的下载项已完成，释放其分组占用的并发数
+        
+        Args:
+            task_id (str): 任务ID
+        """
+        with self._lock:
+            group = self._in_flight.pop(task_id, None)
+            if group is not None:
+                self._group_active[group] -= 1
+                if not self._group_active[group]:
+                    del self._group_active[group]
+    
+    def remove(self, task_id: str) -> Optional[DownloadItem]:
+        """
+        从队列中移除下载项
+        
+        Args:
+            task_id (str): 任务ID
+        
+        Returns:
+            Optional[DownloadItem]: 被移除的下载项，不在队列中时返回None
+        """
+        with self._lock:
+            entry = self._entries.pop(task_id, None)
+            if entry is None:
+                return None
+            item = entry[3]
+            entry[3] = None
+            return item
+    
+    def promote(self, predicate: Callable[[DownloadItem], bool], priority: int = NEEDED) -> int:
+        """
+        提高符合条件的下载项的优先级，例如用户点击“立即启动”时
+        
+        Args:
+            predicate (Callable[[DownloadItem], bool]): 判断下载项是否需要提高优先级
+            priority (int): 新的优先级
+        
+        Returns:
+            int: 提高了优先级的下载项数量
+        """
+        with self._lock:
+            promoted = [
+                entry for entry in self._entries.values()
+                if entry[0] > priority and predicate(entry[3])
+            ]
+            for entry in promoted:
+                item = entry[3]
+                entry[3] = None
+                self._push_entry(item, priority, entry[5])
+            return len(promoted)
+    
+    def clear(self):
+        """
+        清空队列
+        """
+        with self._lock:
+            self._heaps.clear()
+            self._entries.clear()
+    
+    def items(self) -> List[DownloadItem]:
+        """
+        获取队列中的全部下载项，不保证顺序
+        
+        Returns:
+            List[DownloadItem]: 下载项列表
+        """
+        with self._lock:
+            return [entry[3] for entry in self._entries.values()]
+    
+    def __contains__(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._entries
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def __bool__(self) -> bool:
+        return len(self) > 0
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+class InFlightTransfer:
+    """
+    正在进行的文件传输，其他请求同一文件的调用方可以等待其完成
+    """
+    
+    def __init__(self, key: str, sha1: str, size: int):
+        """
+        初始化传输
+        
+        Args:
+            key (str): 目标路径
+            sha1 (str): 预期sha1，未知时为空
+            size (int): 预期大小，未知时为0
+        """
+        self.key = key
+        self.sha1 = sha1
+        self.size = size
+        self.waiters = 0
+        self.success = False
+        self._done = threading.Event()
+    
+    def matches(self, sha1: str) -> bool:
+        """
+        判断另一个请求是否可以复用本次传输
+        
+        Args:
+            sha1 (str): 另一个请求的预期sha1
+        
+        Returns:
+            bool: sha1一致或其中一方未知时返回True
+        """
+        return not sha1 or not self.sha1 or sha1 == self.sha1
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待传输完成
+        
+        Args:
+            timeout (Optional[float]): 超时时间（秒），为None时一直等待
+        
+        Returns:
+            bool: 传输是否成功，超时返回False
+        """
+        if not self._done.wait(timeout):
+            return False
+        return self.success
+    
+    def complete(self, success: bool):
+        """
+        标记传输结束并唤醒所有等待者
+        
+        Args:
+            success (bool): 是否成功
+        """
+        self.success = success
+        self._done.set()
+
+class InFlightRegistry:
+    """
+    正在进行的下载登记表，按目标路径和sha1合并重复的下载
+    
+    多个版本（或版本与模组加载器）同时需要同一个库文件或资源文件时，
+    只有第一个请求真正下载，其余请求等待其完成后直接使用结果。
+    """
+    
+    def __init__(self):
+        """
+        初始化下载登记表
+        """
+        self._transfers = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.saved_bytes = 0
+    
+    @staticmethod
+    def _key(dest_path: str) -> str:
+        """
+        计算目标路径的登记键
+        
+        Args:
+            dest_path (str): 目标路径
+        
+        Returns:
+            str: 登记键
+        """
+        return os.path.normcase(os.path.abspath(dest_path))
+    
+    def begin(self, dest_path: str, sha1: str = "", size: int = 0) -> Tuple[InFlightTransfer, bool]:
+        """
+        登记一次下载，不会阻塞
+        
+        Args:
+            dest_path (str): 目标路径
+            sha1 (str): 预期sha1，未知时为空
+            size (int): 预期大小，未知时为0
+        
+        Returns:
+            Tuple[InFlightTransfer, bool]: 传输以及调用方是否负责下载。调用方不负责下载时，
+                若transfer.matches(sha1)则等待其完成即可；否则同一路径正在下载另一个文件，
+                需等待其结束后重新登记，避免两个传输写入同一个部分下载文件
+        """
+        key = self._key(dest_path)
+        sha1 = (sha1 or "").lower()
+        with self._lock:
+            transfer = self._transfers.get(key)
+            if transfer is None:
+                transfer = InFlightTransfer(key, sha1, size)
+                self._transfers[key] = transfer
+                return transfer, True
+            
+            if transfer.matches(sha1):
+                transfer.waiters += 1
+                self.coalesced += 1
+                self.saved_bytes += size or transfer.size
+            return transfer, False
+    
+    def acquire(self, dest_path: str, sha1: str = "", size: int = 0) -> Tuple[InFlightTransfer, bool]:
+        """
+        登记一次下载，同一路径正在下载另一个文件时等待其结束
+        
+        Args:
+            dest_path (str): 目标路径
+            sha1 (str): 预期sha1，未知时为空
+            size (int): 预期大小，未知时为0
+        
+        Returns:
+            Tuple[InFlightTransfer, bool]: 传输以及调用方是否负责下载；为False时调用方应等待传输完成
+        """
+        while True:
+            transfer, owner = self.begin(dest_path, sha1, size)
+            if owner or transfer.matches((sha1 or "").lower()):
+                return transfer, owner
+            transfer.wait()
+    
+    def finish(self, transfer: InFlightTransfer, success: bool):
+        """
+        结束下载并唤醒所有等待者
+        
+        Args:
+            transfer (InFlightTransfer): 传输
+            success (bool): 是否成功
+        """
+        with self._lock:
+            if self._transfers.get(transfer.key) is transfer:
+                del self._transfers[transfer.key]
+        transfer.complete(success)
+    
+    def get_stats(self) -> Dict:
+        """
+        获取合并下载的统计信息
+        
+        Returns:
+            Dict: 正在下载的文件数、合并的请求数和节省的字节数
+        """
+        with self._lock:
+            return {
+                "in_flight": len(self._transfers),
+                "coalesced": self.coalesced,
+                "saved_bytes": self.saved_bytes
+            }
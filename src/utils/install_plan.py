@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from typing import Dict, List, Optional
+
+class DownloadItem:
+    """
+    下载项，描述一个需要下载的文件
+    """
+    
+    __slots__ = ("task_id", "url", "path", "sha1", "size", "kind")
+    
+    def __init__(self, task_id: str, url: str, path: str, sha1: str = "", size: int = 0, kind: str = ""):
+        """
+        初始化下载项
+        
+        Args:
+            task_id (str): 任务ID
+            url (str): 下载URL
+            path (str): 目标文件路径
+            sha1 (str): 文件sha1，未知时为空
+            size (int): 文件大小，未知时为0
+            kind (str): 文件类型 (client, library, native, asset_index等)
+        """
+        self.task_id = task_id
+        self.url = url
+        self.path = path
+        self.sha1 = sha1
+        self.size = size
+        self.kind = kind
+    
+    def to_dict(self) -> Dict:
+        """
+        转换为可序列化的字典
+        
+        Returns:
+            Dict: 下载项数据
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DownloadItem":
+        """
+        从字典创建下载项
+        
+        Args:
+            data (Dict): 下载项数据
+        
+        Returns:
+            DownloadItem: 下载项
+        """
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+    
+    def __repr__(self):
+        return f"DownloadItem({self.task_id!r}, {self.url!r}, {self.path!r})"
+
+class InstallPlan:
+    """
+    安装计划，一次性解析出安装某个版本所需的全部元数据和文件
+    
+    计划在安装开始前构建一次，之后在所有下载阶段之间传递，
+    并保存在版本目录中，供修复时直接复用而无需再次获取元数据。
+    """
+    
+    # 安装计划文件名，保存在versions/<id>/目录下
+    PLAN_FILE = "tmcl-install-plan.json"
+    
+    def __init__(self, version_id: str, dest_dir: str, manifest_entry: Dict, version_info: Dict,
+                 client: Optional[DownloadItem] = None, libraries: Optional[List[DownloadItem]] = None,
+                 natives: Optional[List[DownloadItem]] = None, asset_index: Optional[DownloadItem] = None,
+                 native_excludes: Optional[Dict[str, List[str]]] = None):
+        """
+        初始化安装计划
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 游戏目录
+            manifest_entry (Dict): 版本清单条目
+            version_info (Dict): 版本JSON
+            client (Optional[DownloadItem]): 客户端jar
+            libraries (Optional[List[DownloadItem]]): 库文件
+            natives (Optional[List[DownloadItem]]): 本地库文件
+            asset_index (Optional[DownloadItem]): 资源索引文件
+            native_excludes (Optional[Dict[str, List[str]]]): 本地库解压时排除的路径，按任务ID索引
+        """
+        self.version_id = version_id
+        self.dest_dir = dest_dir
+        self.manifest_entry = manifest_entry
+        self.version_info = version_info
+        self.client = client
+        self.libraries = libraries or []
+        self.natives = natives or []
+        self.asset_index = asset_index
+        self.native_excludes = native_excludes or {}
+    
+    @property
+    def version_dir(self) -> str:
+        """
+        版本目录
+        """
+        return os.path.join(self.dest_dir, "versions", self.version_id)
+    
+    @property
+    def version_json_path(self) -> str:
+        """
+        版本JSON文件路径
+        """
+        return os.path.join(self.version_dir, f"{self.version_id}.json")
+    
+    def all_items(self) -> List[DownloadItem]:
+        """
+        获取计划中的全部下载项
+        
+        Returns:
+            List[DownloadItem]: 下载项列表
+        """
+        items = []
+        if self.client:
+            items.append(self.client)
+        items.extend(self.libraries)
+        items.extend(self.natives)
+        if self.asset_index:
+            items.append(self.asset_index)
+        return items
+    
+    def to_dict(self) -> Dict:
+        """
+        转换为可序列化的字典
+        
+        Returns:
+            Dict: 安装计划数据
+        """
+        return {
+            "version_id": self.version_id,
+            "manifest_entry": self.manifest_entry,
+            "version_info": self.version_info,
+            "client": self.client.to_dict() if self.client else None,
+            "libraries": [item.to_dict() for item in self.libraries],
+            "natives": [item.to_dict() for item in self.natives],
+            "asset_index": self.asset_index.to_dict() if self.asset_index else None,
+            "native_excludes": self.native_excludes
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict, dest_dir: str) -> "InstallPlan":
+        """
+        从字典创建安装计划
+        
+        Args:
+            data (Dict): 安装计划数据
+            dest_dir (str): 游戏目录
+        
+        Returns:
+            InstallPlan: 安装计划
+        """
+        return cls(
+            data["version_id"],
+            dest_dir,
+            data.get("manifest_entry", {}),
+            data.get("version_info", {}),
+            client=DownloadItem.from_dict(data["client"]) if data.get("client") else None,
+            libraries=[DownloadItem.from_dict(item) for item in data.get("libraries", [])],
+            natives=[DownloadItem.from_dict(item) for item in data.get("natives", [])],
+            asset_index=DownloadItem.from_dict(data["asset_index"]) if data.get("asset_index") else None,
+            native_excludes=data.get("native_excludes", {})
+        )
+    
+    def save(self) -> bool:
+        """
+        将安装计划保存到版本目录
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            os.makedirs(self.version_dir, exist_ok=True)
+            plan_path = os.path.join(self.version_dir, self.PLAN_FILE)
+            tmp_path = f"{plan_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, plan_path)
+            return True
+        except Exception:
+            return False
+    
+    @classmethod
+    def load(cls, version_id: str, dest_dir: str) -> Optional["InstallPlan"]:
+        """
+        从版本目录加载已保存的安装计划
+        
+        Args:
+            version_id (str): 版本ID
+            dest_dir (str): 游戏目录
+        
+        Returns:
+            Optional[InstallPlan]: 安装计划，如果不存在或已损坏则返回None
+        """
+        plan_path = os.path.join(dest_dir, "versions", version_id, cls.PLAN_FILE)
+        try:
+            with open(plan_path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f), dest_dir)
+        except Exception:
+            return None
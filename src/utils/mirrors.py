@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ..utils.logger import logger
+
+class Mirror:
+    """
+    下载镜像，负责将官方下载地址转换为镜像地址
+    """
+    
+    def __init__(self, name: str, url_map: Optional[Dict[str, str]] = None):
+        """
+        初始化镜像
+        
+        Args:
+            name (str): 镜像名称
+            url_map (Optional[Dict[str, str]]): 官方地址前缀到镜像地址前缀的映射，为None时表示官方源
+        """
+        self.name = name
+        self.url_map = url_map
+    
+    def map_url(self, url: str) -> Optional[str]:
+        """
+        将官方下载地址转换为该镜像的地址
+        
+        Args:
+            url (str): 官方下载地址
+        
+        Returns:
+            Optional[str]: 镜像地址，镜像不提供该文件时返回None
+        """
+        if self.url_map is None:
+            return url
+        
+        for official_base, mirror_base in self.url_map.items():
+            if url.startswith(official_base):
+                return f"{mirror_base}{url[len(official_base):]}"
+        return None
+    
+    def __repr__(self):
+        return f"Mirror({self.name!r})"
+
+class MirrorHealth:
+    """
+    镜像健康状态，记录平均延迟和失败次数
+    """
+    
+    # 延迟指数移动平均的权重
+    LATENCY_ALPHA = 0.3
+    
+    # 尚未测量时假定的延迟（秒）
+    DEFAULT_LATENCY = 1.0
+    
+    def __init__(self):
+        """
+        初始化镜像健康状态
+        """
+        self.latency = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+    
+    def record_success(self, latency: float):
+        """
+        记录一次成功的请求
+        
+        Args:
+            latency (float): 收到响应头的耗时（秒）；下载文件时在文件通过校验后才记录
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.LATENCY_ALPHA * (latency - self.latency)
+        self.successes += 1
+        self.consecutive_failures = 0
+    
+    def record_failure(self):
+        """
+        记录一次失败的请求
+        """
+        self.failures += 1
+        self.consecutive_failures += 1
+    
+    @property
+    def score(self) -> float:
+        """
+        健康评分，越小越好；连续失败会成倍增加评分
+        """
+        latency = self.DEFAULT_LATENCY if self.latency is None else self.latency
+        return latency * (1 + 2 * self.consecutive_failures)
+
+class MirrorRegistry:
+    """
+    镜像注册表，对镜像进行测速和健康评分，下载时按评分自动选择和切换镜像
+    
+    首次使用时同时向所有镜像发起请求，以最先返回数据的镜像作为本次会话的首选镜像；
+    首选镜像连续失败时自动切换到评分最好的镜像。
+    """
+    
+    # 首选镜像连续失败多少次后重新选择
+    FAILOVER_THRESHOLD = 3
+    
+    def __init__(self, mirrors: List[Mirror], probe_url: Optional[str] = None, probe_timeout: float = 5.0):
+        """
+        初始化镜像注册表
+        
+        Args:
+            mirrors (List[Mirror]): 镜像列表，顺序即未测速时的优先级
+            probe_url (Optional[str]): 测速使用的官方地址，为None时不自动测速
+            probe_timeout (float): 测速超时时间（秒）
+        """
+        self.mirrors = list(mirrors)
+        self.probe_url = probe_url
+        self.probe_timeout = probe_timeout
+        self.health = {mirror.name: MirrorHealth() for mirror in self.mirrors}
+        self.preferred = None
+        self._probed = False
+        self._lock = threading.RLock()
+    
+    @classmethod
+    def default(cls, api_base_url: str, url_map: Dict[str, str], probe_url: Optional[str] = None) -> "MirrorRegistry":
+        """
+        创建包含BMCLAPI和官方源的默认镜像注册表
+        
+        Args:
+            api_base_url (str): BMCL API基础URL
+            url_map (Dict[str, str]): 官方地址前缀到BMCL API路径的映射
+            probe_url (Optional[str]): 测速使用的官方地址
+        
+        Returns:
+            MirrorRegistry: 镜像注册表
+        """
+        bmclapi = Mirror("bmclapi", {
+            official_base: f"{api_base_url}{mirror_path}"
+            for official_base, mirror_path in url_map.items()
+        })
+        return cls([bmclapi, Mirror("official")], probe_url)
+    
+    def _ordered_mirrors(self) -> List[Mirror]:
+        """
+        按优先级排列镜像，首选镜像排在最前
+        
+        Returns:
+            List[Mirror]: 镜像列表
+        """
+        with self._lock:
+            if self.preferred is not None:
+                health = self.health[self.preferred.name]
+                others = [mirror for mirror in self.mirrors if mirror is not self.preferred]
+                if health.consecutive_failures >= self.FAILOVER_THRESHOLD and others:
+                    # 首选镜像不可用，切换到其他镜像中评分最好的一个；
+                    # 不与首选镜像比较，否则延迟很低的首选镜像连续失败后仍可能胜出
+                    best = min(others, key=lambda mirror: self.health[mirror.name].score)
+                    logger.warning(f"镜像{self.preferred.name}连续失败，切换到{best.name}")
+                    self.preferred = best
+            
+            ordered = sorted(self.mirrors, key=lambda mirror: self.health[mirror.name].score)
+            if self.preferred is not None:
+                ordered.remove(self.preferred)
+                ordered.insert(0, self.preferred)
+            return ordered
+    
+    def candidate_urls(self, url: str) -> List[Tuple[Mirror, str]]:
+        """
+        获取下载地址的候选镜像地址，按优先级排列
+        
+        Args:
+            url (str): 官方下载地址
+        
+        Returns:
+            List[Tuple[Mirror, str]]: (镜像, 镜像地址)列表，没有镜像能处理时返回原地址
+        """
+        if not self._probed and self.probe_url:
+            self.probe()
+        
+        candidates = []
+        for mirror in self._ordered_mirrors():
+            mirror_url = mirror.map_url(url)
+            if mirror_url and all(mirror_url != existing for _, existing in candidates):
+                candidates.append((mirror, mirror_url))
+        
+        return candidates or [(Mirror("direct"), url)]
+    
+    def resolve(self, url: str) -> str:
+        """
+        获取下载地址在首选镜像上的地址
+        
+        Args:
+            url (str): 官方下载地址
+        
+        Returns:
+            str: 镜像地址
+        """
+        return self.candidate_urls(url)[0][1]
+    
+    def report_success(self, mirror: Mirror, latency: float):
+        """
+        报告一次成功的请求
+        
+        Args:
+            mirror (Mirror): 镜像
+            latency (float): 收到响应头的耗时（秒）；下载文件时在文件通过校验后才记录
+        """
+        with self._lock:
+            if mirror.name in self.health:
+                self.health[mirror.name].record_success(latency)
+    
+    def report_failure(self, mirror: Mirror):
+        """
+        报告一次失败的请求
+        
+        Args:
+            mirror (Mirror): 镜像
+        """
+        with self._lock:
+            if mirror.name in self.health:
+                self.health[mirror.name].record_failure()
+    
+    def _handle_failure(self, mirror: Mirror, mirror_url: str, error: Exception, last_error: Optional[Exception],
+                        keep_error: Optional[Callable[[Exception], bool]], description: str) -> Exception:
+        """
+        记录一个镜像的失败，返回需要保留的错误
+        
+        Args:
+            mirror (Mirror): 镜像
+            mirror_url (str): 镜像地址
+            error (Exception): 本次的错误
+            last_error (Optional[Exception]): 之前保留的错误
+            keep_error (Optional[Callable[[Exception], bool]]): 判断错误是否应优先保留
+            description (str): 日志中的描述
+        
+        Returns:
+            Exception: 需要保留的错误
+        """
+        self.report_failure(mirror)
+        logger.warning(f"从镜像{mirror.name}{description}失败: {mirror_url}. 错误: {str(error)}")
+        # 优先保留临时性错误，使其他镜像的404等错误不会阻止重试
+        if last_error is None or keep_error is None or not keep_error(last_error):
+            return error
+        return last_error
+    
+    def call(self, url: str, func: Callable, keep_error: Optional[Callable[[Exception], bool]] = None,
+             description: str = "请求", abort: Optional[Callable[[], bool]] = None):
+        """
+        按优先级依次从各镜像调用func，失败时切换到下一个镜像，并根据结果更新镜像的健康评分
+        
+        func(mirror_url)返回(结果, 收到响应头的耗时)，耗时为None时（例如下载被中止）不更新健康评分。
+        只有func正常返回才算成功，因此下载文件时应在文件通过校验后再返回，
+        返回损坏内容的镜像才会累计失败次数并被切换掉。
+        
+        Args:
+            url (str): 官方地址
+            func (Callable): 从一个镜像地址请求的函数
+            keep_error (Optional[Callable[[Exception], bool]]): 判断错误是否应优先保留，例如临时性错误
+            description (str): 日志中的描述
+            abort (Optional[Callable[[], bool]]): 返回True时不再切换镜像并抛出当前的错误
+        
+        Returns:
+            func返回的结果
+        
+        Raises:
+            Exception: 所有镜像都失败时抛出保留的错误
+        """
+        last_error = None
+        for mirror, mirror_url in self.candidate_urls(url):
+            try:
+                result, latency = func(mirror_url)
+            except Exception as e:
+                if abort is not None and abort():
+                    raise
+                last_error = self._handle_failure(mirror, mirror_url, e, last_error, keep_error, description)
+                continue
+            
+            if latency is not None:
+                self.report_success(mirror, latency)
+            return result
+        
+        raise last_error
+    
+    async def call_async(self, url: str, func: Callable, keep_error: Optional[Callable[[Exception], bool]] = None,
+                         description: str = "请求", abort: Optional[Callable[[], bool]] = None):
+        """
+        与call相同，func为返回协程的函数
+        
+        Args:
+            url (str): 官方地址
+            func (Callable): 从一个镜像地址请求的协程函数
+            keep_error (Optional[Callable[[Exception], bool]]): 判断错误是否应优先保留，例如临时性错误
+            description (str): 日志中的描述
+            abort (Optional[Callable[[], bool]]): 返回True时不再切换镜像并抛出当前的错误
+        
+        Returns:
+            协程返回的结果
+        
+        Raises:
+            Exception: 所有镜像都失败时抛出保留的错误
+        """
+        last_error = None
+        for mirror, mirror_url in self.candidate_urls(url):
+            try:
+                result, latency = await func(mirror_url)
+            except Exception as e:
+                if abort is not None and abort():
+                    raise
+                last_error = self._handle_failure(mirror, mirror_url, e, last_error, keep_error, description)
+                continue
+            
+            if latency is not None:
+                self.report_success(mirror, latency)
+            return result
+        
+        raise last_error
+    
+    def race(self, url: str, timeout: Optional[float] = None) -> Optional[Mirror]:
+        """
+        同时向所有镜像请求同一个文件，返回最先收到数据的镜像
+        
+        未获胜的请求在后台继续完成，其延迟同样计入健康评分。
+        
+        Args:
+            url (str): 官方下载地址
+            timeout (Optional[float]): 超时时间（秒）
+        
+        Returns:
+            Optional[Mirror]: 最快的镜像，全部失败时返回None
+        """
+        timeout = timeout or self.probe_timeout
+        
+        def fetch_first_bytes(mirror: Mirror, mirror_url: str) -> Mirror:
+            start = time.monotonic()
+            try:
+                with requests.get(mirror_url, stream=True, timeout=timeout,
+                                  headers={"User-Agent": "TMCL Launcher"}) as response:
+                    response.raise_for_status()
+                    next(response.iter_content(chunk_size=1024), None)
+            except Exception:
+                self.report_failure(mirror)
+                raise
+            self.report_success(mirror, time.monotonic() - start)
+            return mirror
+        
+        targets = [(mirror, mirror.map_url(url)) for mirror in self.mirrors]
+        targets = [(mirror, mirror_url) for mirror, mirror_url in targets if mirror_url]
+        if not targets:
+            return None
+        
+        executor = ThreadPoolExecutor(max_workers=len(targets))
+        try:
+            futures = [executor.submit(fetch_first_bytes, mirror, mirror_url) for mirror, mirror_url in targets]
+            try:
+                for future in as_completed(futures, timeout=timeout):
+                    if future.exception() is None:
+                        return future.result()
+            except Exception:
+                pass
+            return None
+        finally:
+            executor.shutdown(wait=False)
+    
+    def probe(self, url: Optional[str] = None) -> Optional[Mirror]:
+        """
+        测速并选出本次会话的首选镜像
+        
+        Args:
+            url (Optional[str]): 测速使用的官方地址，默认为probe_url
+        
+        Returns:
+            Optional[Mirror]: 首选镜像，全部失败时返回None
+        """
+        with self._lock:
+            self._probed = True
+        
+        winner = self.race(url or self.probe_url)
+        with self._lock:
+            if winner is not None:
+                self.preferred = winner
+                logger.info(f"镜像测速完成，使用{winner.name}")
+            else:
+                logger.warning("镜像测速失败，按默认顺序使用镜像")
+        return winner
+    
+    def get_health(self) -> Dict[str, Dict]:
+        """
+        获取所有镜像的健康状态
+        
+        Returns:
+            Dict[str, Dict]: 镜像名称到健康状态的映射
+        """
+        with self._lock:
+            return {
+                name: {
+                    "latency": health.latency,
+                    "successes": health.successes,
+                    "failures": health.failures,
+                    "score": health.score,
+                    "preferred": self.preferred is not None and self.preferred.name == name
+                }
+                for name, health in self.health.items()
+            }
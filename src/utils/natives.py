@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import shutil
+import threading
+import zipfile
+from typing import Dict, List, Optional
+
+from ..utils.install_plan import DownloadItem
+from ..utils.logger import logger
+
+class NativesCache:
+    """
+    本地库解压缓存
+    
+    本地库jar按内容哈希解压到缓存目录，同一组本地库只解压一次，
+    之后每次启动直接复用，不必每次都重新解压。
+    """
+    
+    def __init__(self, cache_root: str):
+        """
+        初始化本地库解压缓存
+        
+        Args:
+            cache_root (str): 缓存根目录
+        """
+        self.cache_root = cache_root
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _cache_key(natives: List[DownloadItem]) -> str:
+        """
+        根据本地库内容计算缓存键
+        
+        Args:
+            natives (List[DownloadItem]): 本地库下载项
+        
+        Returns:
+            str: 缓存键
+        """
+        # sha1未知时退回到文件路径
+        parts = sorted(item.sha1 or item.path for item in natives)
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _is_excluded(name: str, excludes: List[str]) -> bool:
+        """
+        判断压缩包中的文件是否被排除
+        
+        Args:
+            name (str): 压缩包内的文件名
+            excludes (List[str]): 排除的路径前缀
+        
+        Returns:
+            bool: 是否排除
+        """
+        return any(name.startswith(prefix) for prefix in excludes)
+    
+    def get_natives_dir(self, natives: List[DownloadItem],
+                        excludes: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
+        """
+        获取解压后的本地库目录，缓存中不存在时解压
+        
+        Args:
+            natives (List[DownloadItem]): 本地库下载项，文件需已下载
+            excludes (Optional[Dict[str, List[str]]]): 每个任务ID对应的排除路径前缀
+        
+        Returns:
+            Optional[str]: 本地库目录，解压失败时返回None
+        """
+        excludes = excludes or {}
+        natives_dir = os.path.join(self.cache_root, self._cache_key(natives))
+        
+        with self._lock:
+            if os.path.isdir(natives_dir):
+                return natives_dir
+            
+            # 先解压到临时目录，完成后再重命名，避免中断后留下不完整的目录
+            tmp_dir = f"{natives_dir}.tmp"
+            try:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                os.makedirs(tmp_dir)
+                
+                for item in natives:
+                    item_excludes = excludes.get(item.task_id, [])
+                    with zipfile.ZipFile(item.path) as jar:
+                        for info in jar.infolist():
+                            if info.is_dir() or self._is_excluded(info.filename, item_excludes):
+                                continue
+                            jar.extract(info, tmp_dir)
+                
+                os.replace(tmp_dir, natives_dir)
+                logger.info(f"本地库解压完成: {natives_dir}")
+                return natives_dir
+            except Exception as e:
+                logger.error(f"解压本地库失败: {str(e)}")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return None
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional
+
+class IntegrityError(IOError):
+    """
+    下载的文件与预期的大小或sha1不一致
+    """
+    pass
+
+class PartialDownload:
+    """
+    可续传的部分下载文件
+    
+    数据写入<dest>.part，旁边的<dest>.part.json日志记录下载地址、预期大小、
+    sha1和已写入的字节数。下载中断后再次下载同一文件时，可以通过HTTP Range
+    请求从已写入的位置继续，而不必从头开始。
+    
+    写入的同时计算sha1，提交时与预期的大小和sha1比较，不一致的文件不会被重命名为目标文件。
+    """
+    
+    # 日志更新间隔（字节），避免每个数据块都写入日志
+    CHECKPOINT_INTERVAL = 4 * 1024 * 1024
+    
+    # 续传时读取已有部分计算哈希的块大小
+    HASH_READ_SIZE = 1024 * 1024
+    
+    # 不小于该大小的文件预先分配磁盘空间
+    PREALLOCATE_THRESHOLD = 1024 * 1024
+    
+    def __init__(self, dest_path: str, url: str, expected_size: int = 0, sha1: str = ""):
+        """
+        初始化部分下载文件
+        
+        Args:
+            dest_path (str): 目标文件路径
+            url (str): 下载URL
+            expected_size (int): 预期文件大小，未知时为0
+            sha1 (str): 预期sha1，未知时为空
+        """
+        self.dest_path = dest_path
+        self.part_path = f"{dest_path}.part"
+        self.journal_path = f"{dest_path}.part.json"
+        self.url = url
+        self.expected_size = expected_size
+        self.sha1 = sha1
+        self.bytes_written = 0
+        self._file = None
+        self._last_checkpoint = 0
+        self._hasher = hashlib.sha1()
+    
+    def _load_journal(self) -> Optional[Dict]:
+        """
+        读取日志
+        
+        Returns:
+            Optional[Dict]: 日志内容，不存在或损坏时返回None
+        """
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+    
+    def _save_journal(self):
+        """
+        写入日志，写入前先刷新数据，保证日志中的字节数不超过磁盘上的数据
+        """
+        if self._file and not self._file.closed:
+            self._file.flush()
+        
+        journal = {
+            "url": self.url,
+            "expected_size": self.expected_size,
+            "sha1": self.sha1,
+            "bytes_written": self.bytes_written
+        }
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(journal, f)
+        os.replace(tmp_path, self.journal_path)
+        self._last_checkpoint = self.bytes_written
+    
+    def _matches_journal(self, journal: Dict) -> bool:
+        """
+        判断日志是否属于同一个文件
+        
+        Args:
+            journal (Dict): 日志内容
+        
+        Returns:
+            bool: 是否匹配
+        """
+        # 有sha1时以sha1为准，不同镜像的下载地址可以互相续传
+        if self.sha1 or journal.get("sha1"):
+            return journal.get("sha1") == self.sha1 and journal.get("expected_size", 0) == self.expected_size
+        return journal.get("url") == self.url
+    
+    def open(self) -> int:
+        """
+        打开部分下载文件，返回可以续传的起始位置
+        
+        Returns:
+            int: 续传起始位置，为0时表示从头下载
+        """
+        os.makedirs(os.path.dirname(self.dest_path), exist_ok=True)
+        
+        offset = 0
+        journal = self._load_journal()
+        if journal and self._matches_journal(journal) and os.path.exists(self.part_path):
+            offset = min(journal.get("bytes_written", 0), os.path.getsize(self.part_path))
+            # 已写满预期大小的文件无法再请求剩余部分，重新下载
+            if self.expected_size and offset >= self.expected_size:
+                offset = 0
+        
+        mode = "r+b" if offset and os.path.exists(self.part_path) else "wb"
+        self._file = open(self.part_path, mode)
+        self._file.truncate(offset)
+        
+        # 续传时先对已有部分计算哈希，之后的数据边写入边计算
+        self._hasher = hashlib.sha1()
+        remaining = offset
+        while remaining:
+            data = self._file.read(min(remaining, self.HASH_READ_SIZE))
+            if not data:
+                break
+            self._hasher.update(data)
+            remaining -= len(data)
+        
+        self._file.seek(offset)
+        self.bytes_written = offset
+        self._save_journal()
+        return offset
+    
+    def preallocate(self, total_size: int):
+        """
+        按文件总大小预先分配磁盘空间，减少大文件的碎片和写入时的元数据更新
+        
+        不支持posix_fallocate的平台和文件系统上不做任何操作。
+        
+        Args:
+            total_size (int): 文件总大小
+        """
+        if not hasattr(os, "posix_fallocate") or total_size < self.PREALLOCATE_THRESHOLD:
+            return
+        if total_size <= self.bytes_written:
+            return
+        try:
+            self._file.flush()
+            os.posix_fallocate(self._file.fileno(), self.bytes_written, total_size - self.bytes_written)
+        except OSError:
+            pass
+    
+    def range_headers(self) -> Dict[str, str]:
+        """
+        获取续传所需的请求头
+        
+        Returns:
+            Dict[str, str]: 请求头，从头下载时为空
+        """
+        if self.bytes_written:
+            return {"Range": f"bytes={self.bytes_written}-"}
+        return {}
+    
+    def accept_status(self, status_code: int) -> int:
+        """
+        根据响应状态码确认续传位置，服务器不支持Range时从头写入
+        
+        Args:
+            status_code (int): HTTP状态码
+        
+        Returns:
+            int: 实际的写入起始位置
+        
+        Raises:
+            IntegrityError: 服务器无法从已写入的位置续传（416），已丢弃部分文件，重试时从头下载
+        """
+        if status_code == 416 and self.bytes_written:
+            # 请求范围无效，说明部分文件与服务器上的文件不一致；
+            # 416属于不可重试的客户端错误，因此改为抛出可重试的IntegrityError，下次请求不带Range
+            offset = self.bytes_written
+            self.restart()
+            raise IntegrityError(f"服务器无法从{offset}字节处续传，已丢弃部分文件")
+        elif self.bytes_written and status_code != 206 and 200 <= status_code < 300:
+            # 服务器返回了完整内容；错误响应不丢弃已下载的部分，重试时继续续传
+            self.restart()
+        return self.bytes_written
+    
+    def restart(self):
+        """
+        丢弃已写入的数据，从头开始写入
+        """
+        self._file.seek(0)
+        self._file.truncate()
+        self.bytes_written = 0
+        self._hasher = hashlib.sha1()
+        self._save_journal()
+    
+    def write(self, data):
+        """
+        写入数据
+        
+        Args:
+            data: 数据块，可以是bytes或memoryview
+        """
+        self._file.write(data)
+        self._hasher.update(data)
+        self.bytes_written += len(data)
+        if self.bytes_written - self._last_checkpoint >= self.CHECKPOINT_INTERVAL:
+            self._save_journal()
+    
+    def write_from(self, readinto: Callable, buffer: memoryview) -> int:
+        """
+        从数据源读取一块数据到缓冲区并写入，避免为每个数据块创建新的bytes对象
+        
+        Args:
+            readinto (Callable): 数据源的readinto方法
+            buffer (memoryview): 可重复使用的缓冲区
+        
+        Returns:
+            int: 读取的字节数，为0时表示数据已读完
+        """
+        size = readinto(buffer)
+        if size:
+            self.write(buffer[:size])
+        return size or 0
+    
+    def hexdigest(self) -> str:
+        """
+        获取已写入数据的sha1
+        
+        Returns:
+            str: sha1十六进制字符串
+        """
+        return self._hasher.hexdigest()
+    
+    def close(self):
+        """
+        关闭文件并保留已写入的数据，供下次续传
+        """
+        if self._file and not self._file.closed:
+            try:
+                self._save_journal()
+            finally:
+                self._file.close()
+    
+    def commit(self):
+        """
+        校验并提交下载，将部分下载文件重命名为目标文件并删除日志
+        
+        Raises:
+            IntegrityError: 已写入的大小或sha1与预期不一致。数据不足时保留已写入的部分供续传，
+                否则丢弃已写入的数据，重试时从头下载
+        """
+        if self.expected_size and self.bytes_written != self.expected_size:
+            message = f"文件大小不匹配: 预期{self.expected_size}字节，实际{self.bytes_written}字节"
+            if self.bytes_written > self.expected_size:
+                self.restart()
+            raise IntegrityError(message)
+        
+        if self.sha1:
+            sha1 = self._hasher.hexdigest()
+            if sha1 != self.sha1.lower():
+                self.restart()
+                raise IntegrityError(f"文件sha1不匹配: 预期{self.sha1.lower()}，实际{sha1}")
+        
+        if self._file and not self._file.closed:
+            # 去掉预分配但没有写入的空间
+            self._file.truncate(self.bytes_written)
+            self._file.close()
+        os.replace(self.part_path, self.dest_path)
+        self._remove(self.journal_path)
+    
+    def discard(self):
+        """
+        关闭并删除部分下载文件和日志
+        """
+        if self._file and not self._file.closed:
+            self._file.close()
+        self._remove(self.part_path)
+        self._remove(self.journal_path)
+    
+    @staticmethod
+    def _remove(file_path: str):
+        """
+        删除文件，忽略错误
+        
+        Args:
+            file_path (str): 文件路径
+        """
+        if os.path.exists(file_path):
+            try:
+                os.remove(file_path)
+            except Exception:
+                pass
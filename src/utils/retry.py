@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import email.utils
+import random
+import socket
+import time
+from typing import Callable, Optional
+
+import requests
+import urllib3
+
+from ..utils.logger import logger
+from ..utils.partial_download import IntegrityError
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+class RetryPolicy:
+    """
+    下载重试策略，所有下载路径共用
+    
+    只重试临时性错误（超时、连接中断、5xx、408、429和内容校验失败），按带随机抖动的指数退避等待，
+    429和503响应带有Retry-After时至少等待其指定的时间。其他错误（如404）立即失败。
+    """
+    
+    # 错误类型
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    SERVER = "server"
+    RATE_LIMITED = "rate_limited"
+    INTEGRITY = "integrity"
+    CLIENT = "client"
+    OTHER = "other"
+    
+    # 可以重试的错误类型
+    TRANSIENT = (TIMEOUT, CONNECTION, SERVER, RATE_LIMITED, INTEGRITY)
+    
+    # 视为临时性错误的4xx状态码
+    TRANSIENT_STATUS = (408, 429)
+    
+    # 超时异常
+    TIMEOUT_ERRORS = (requests.exceptions.Timeout, urllib3.exceptions.TimeoutError, socket.timeout,
+                      TimeoutError, asyncio.TimeoutError)
+    
+    # 连接建立失败、连接被重置或响应未接收完整；直接读取response.raw时抛出的是urllib3的异常
+    CONNECTION_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                         urllib3.exceptions.ProtocolError, ConnectionError)
+    
+    if httpx is not None:
+        TIMEOUT_ERRORS += (httpx.TimeoutException,)
+        CONNECTION_ERRORS += (httpx.NetworkError, httpx.RemoteProtocolError)
+    
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        初始化重试策略
+        
+        Args:
+            max_attempts (int): 最大尝试次数（包括第一次）
+            base_delay (float): 第一次重试前的基准等待时间（秒）
+            max_delay (float): 最长等待时间（秒），Retry-After超过该值时不再重试
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        """
+        获取HTTP错误的状态码
+        
+        Args:
+            error (Exception): 异常
+        
+        Returns:
+            Optional[int]: 状态码，不是HTTP错误时返回None
+        """
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None)
+    
+    def classify(self, error: Exception) -> str:
+        """
+        判断错误类型
+        
+        Args:
+            error (Exception): 异常
+        
+        Returns:
+            str: 错误类型
+        """
+        status_code = self._status_code(error)
+        if status_code is not None:
+            if status_code == 429:
+                return self.RATE_LIMITED
+            if status_code >= 500:
+                return self.SERVER
+            if status_code in self.TRANSIENT_STATUS:
+                return self.TIMEOUT
+            return self.CLIENT
+        
+        # 镜像返回了损坏或错误的内容，重新下载通常可以恢复
+        if isinstance(error, IntegrityError):
+            return self.INTEGRITY
+        
+        # 超时异常也是连接异常的子类，需先判断
+        if isinstance(error, self.TIMEOUT_ERRORS):
+            return self.TIMEOUT
+        if isinstance(error, self.CONNECTION_ERRORS):
+            return self.CONNECTION
+        return self.OTHER
+    
+    def is_transient(self, error: Exception) -> bool:
+        """
+        判断错误是否为可以重试的临时性错误
+        
+        Args:
+            error (Exception): 异常
+        
+        Returns:
+            bool: 是否可以重试
+        """
+        return self.classify(error) in self.TRANSIENT
+    
+    def retry_after(self, error: Exception) -> Optional[float]:
+        """
+        获取响应中Retry-After指定的等待时间
+        
+        Args:
+            error (Exception): 异常
+        
+        Returns:
+            Optional[float]: 等待时间（秒），没有Retry-After时返回None
+        """
+        response = getattr(error, "response", None)
+        value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        
+        # Retry-After也可以是HTTP日期
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+    
+    def next_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        计算第attempt次尝试失败后重试前的等待时间
+        
+        Args:
+            error (Exception): 本次尝试的异常
+            attempt (int): 已尝试的次数，从1开始
+        
+        Returns:
+            Optional[float]: 等待时间（秒），不应重试时返回None
+        """
+        if attempt >= self.max_attempts or not self.is_transient(error):
+            return None
+        
+        # 完全抖动的指数退避，避免大量失败的请求同时重试
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+    
+    def call(self, func: Callable, description: str = "", abort: Optional[Callable[[], bool]] = None):
+        """
+        调用func，遇到临时性错误时等待后重试
+        
+        Args:
+            func (Callable): 执行一次尝试的函数
+            description (str): 日志中的描述
+            abort (Optional[Callable[[], bool]]): 返回True时停止等待并抛出最后一次的异常
+        
+        Returns:
+            func的返回值
+        
+        Raises:
+            Exception: 不可重试的错误，或最后一次尝试的错误
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func()
+            except Exception as e:
+                delay = self.next_delay(e, attempt)
+                if delay is None or (abort is not None and abort()):
+                    raise
+                self._log_retry(e, attempt, delay, description)
+                
+                # 分段等待，以便及时响应中止
+                deadline = time.monotonic() + delay
+                while time.monotonic() < deadline:
+                    if abort is not None and abort():
+                        raise
+                    time.sleep(min(0.1, max(0.0, deadline - time.monotonic())))
+    
+    async def call_async(self, func: Callable, description: str = "", abort: Optional[Callable[[], bool]] = None):
+        """
+        调用协程函数func，遇到临时性错误时等待后重试
+        
+        Args:
+            func (Callable): 返回一次尝试的协程的函数
+            description (str): 日志中的描述
+            abort (Optional[Callable[[], bool]]): 返回True时不再重试并抛出最后一次的异常
+        
+        Returns:
+            协程的返回值
+        
+        Raises:
+            Exception: 不可重试的错误，或最后一次尝试的错误
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await func()
+            except Exception as e:
+                delay = self.next_delay(e, attempt)
+                if delay is None or (abort is not None and abort()):
+                    raise
+                self._log_retry(e, attempt, delay, description)
+                await asyncio.sleep(delay)
+                if abort is not None and abort():
+                    raise
+    
+    def _log_retry(self, error: Exception, attempt: int, delay: float, description: str):
+        """
+        记录重试日志
+        
+        Args:
+            error (Exception): 本次尝试的异常
+            attempt (int): 已尝试的次数
+            delay (float): 等待时间（秒）
+            description (str): 日志中的描述
+        """
+        logger.warning(
+            f"{description}第{attempt}次尝试失败({self.classify(error)})，{delay:.1f}秒后重试: {str(error)}"
+        )
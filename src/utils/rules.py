@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..utils.utils import Utils
+
+class PlatformContext:
+    """
+    规则求值的平台上下文，包括系统名称、架构、版本和启动特性
+    """
+    
+    # platform.machine()到规则中架构名称的映射
+    ARCH_MAP = {
+        "i386": "x86",
+        "i686": "x86",
+        "x86": "x86",
+        "amd64": "x86_64",
+        "x86_64": "x86_64",
+        "arm64": "arm64",
+        "aarch64": "arm64"
+    }
+    
+    def __init__(self, os_name: str, os_arch: str, os_version: str, features: Optional[Dict[str, bool]] = None):
+        """
+        初始化平台上下文
+        
+        Args:
+            os_name (str): 系统名称 (windows, osx, linux)
+            os_arch (str): 系统架构 (x86, x86_64, arm64)
+            os_version (str): 系统版本
+            features (Optional[Dict[str, bool]]): 启动特性，如is_demo_user、has_custom_resolution
+        """
+        self.os_name = os_name
+        self.os_arch = os_arch
+        self.os_version = os_version
+        self.features = features or {}
+        self.key = (os_name, os_arch, os_version, tuple(sorted(self.features.items())))
+    
+    @classmethod
+    def current(cls, features: Optional[Dict[str, bool]] = None) -> "PlatformContext":
+        """
+        获取当前系统的平台上下文
+        
+        Args:
+            features (Optional[Dict[str, bool]]): 启动特性
+        
+        Returns:
+            PlatformContext: 平台上下文
+        """
+        os_type = Utils.get_os_type()
+        info = Utils.get_platform_info()
+        os_name = {"macos": "osx"}.get(os_type, os_type)
+        os_arch = cls.ARCH_MAP.get(info["machine"].lower(), info["machine"].lower())
+        # Windows的规则匹配形如10.0的版本号，其他系统使用内核版本
+        os_version = info["version"] if os_type == "windows" else info["release"]
+        return cls(os_name, os_arch, os_version, features)
+
+class RulesEngine:
+    """
+    版本JSON规则引擎
+    
+    每组rules只编译一次为判断函数，库和参数的过滤结果按
+    (版本, 平台, 特性)缓存，避免在任何网络请求前重复求值。
+    """
+    
+    def __init__(self):
+        """
+        初始化规则引擎
+        """
+        self._compiled = {}
+        self._library_cache = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _compile_rule(rule: Dict) -> Tuple[Callable[[PlatformContext], bool], bool]:
+        """
+        将单条规则编译为匹配函数
+        
+        Args:
+            rule (Dict): 规则
+        
+        Returns:
+            Tuple[Callable, bool]: 匹配函数以及匹配时是否允许
+        """
+        os_rule = rule.get("os", {})
+        name = os_rule.get("name")
+        arch = os_rule.get("arch")
+        version = re.compile(os_rule["version"]) if os_rule.get("version") else None
+        features = rule.get("features", {})
+        
+        def matches(context: PlatformContext) -> bool:
+            if name and name != context.os_name:
+                return False
+            if arch and arch != context.os_arch:
+                return False
+            if version and not version.search(context.os_version):
+                return False
+            for feature, expected in features.items():
+                if context.features.get(feature, False) != expected:
+                    return False
+            return True
+        
+        return matches, rule.get("action") == "allow"
+    
+    def compile(self, rules: Optional[List[Dict]]) -> Callable[[PlatformContext], bool]:
+        """
+        将一组规则编译为判断函数，相同的规则只编译一次
+        
+        Args:
+            rules (Optional[List[Dict]]): 规则列表
+        
+        Returns:
+            Callable[[PlatformContext], bool]: 判断函数，返回是否允许
+        """
+        if not rules:
+            return lambda context: True
+        
+        key = json.dumps(rules, sort_keys=True)
+        with self._lock:
+            predicate = self._compiled.get(key)
+            if predicate is not None:
+                return predicate
+        
+        compiled = [self._compile_rule(rule) for rule in rules]
+        
+        def predicate(context: PlatformContext) -> bool:
+            # 存在规则时默认不允许，后面匹配的规则覆盖前面的规则
+            allowed = False
+            for matches, action in compiled:
+                if matches(context):
+                    allowed = action
+            return allowed
+        
+        with self._lock:
+            self._compiled[key] = predicate
+        return predicate
+    
+    def is_allowed(self, rules: Optional[List[Dict]], context: PlatformContext) -> bool:
+        """
+        判断一组规则在指定平台上是否允许
+        
+        Args:
+            rules (Optional[List[Dict]]): 规则列表
+            context (PlatformContext): 平台上下文
+        
+        Returns:
+            bool: 是否允许
+        """
+        return self.compile(rules)(context)
+    
+    def filter_libraries(self, version_id: str, libraries: List[Dict], context: PlatformContext) -> List[Dict]:
+        """
+        过滤出当前平台需要的库，结果按(版本, 平台, 特性)缓存
+        
+        Args:
+            version_id (str): 版本ID
+            libraries (List[Dict]): 版本JSON中的库列表
+            context (PlatformContext): 平台上下文
+        
+        Returns:
+            List[Dict]: 需要的库列表
+        """
+        cache_key = (version_id, context.key)
+        with self._lock:
+            cached = self._library_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        filtered = [lib for lib in libraries if self.is_allowed(lib.get("rules"), context)]
+        
+        with self._lock:
+            self._library_cache[cache_key] = filtered
+        return filtered
+    
+    def filter_arguments(self, arguments: List, context: PlatformContext) -> List[str]:
+        """
+        过滤启动参数，展开带有规则的参数
+        
+        Args:
+            arguments (List): 版本JSON中arguments.game或arguments.jvm的参数列表
+            context (PlatformContext): 平台上下文
+        
+        Returns:
+            List[str]: 当前平台适用的参数
+        """
+        result = []
+        for argument in arguments:
+            if isinstance(argument, str):
+                result.append(argument)
+                continue
+            
+            if not self.is_allowed(argument.get("rules"), context):
+                continue
+            
+            value = argument.get("value", [])
+            if isinstance(value, str):
+                result.append(value)
+            else:
+                result.extend(value)
+        return result
+    
+    def invalidate(self, version_id: Optional[str] = None):
+        """
+        清除库过滤缓存
+        
+        Args:
+            version_id (Optional[str]): 版本ID，为None时清除全部
+        """
+        with self._lock:
+            if version_id is None:
+                self._library_cache.clear()
+            else:
+                for key in [key for key in self._library_cache if key[0] == version_id]:
+                    del self._library_cache[key]
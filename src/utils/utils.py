@@ -5,9 +5,11 @@ import os
 import sys
 import json
 import shutil
+import mmap
 import hashlib
 import platform
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -15,6 +17,10 @@ class Utils:
     """
     工具函数类，提供通用的辅助功能
     """
+    
+    # 批量校验时使用mmap读取的最小文件大小
+    MMAP_THRESHOLD = 1024 * 1024
+    
     @staticmethod
     def get_platform_info():
         """
@@ -81,6 +87,77 @@ class Utils:
         except Exception:
             return None
     
+    @staticmethod
+    def _hash_file(file_path, algorithm='sha1'):
+        """
+        计算文件的哈希值，大文件通过mmap一次性交给hashlib处理
+        
+        Args:
+            file_path (str): 文件路径
+            algorithm (str): 哈希算法
+            
+        Returns:
+            str: 文件哈希值
+        """
+        hash_obj = hashlib.new(algorithm)
+        
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= Utils.MMAP_THRESHOLD:
+                # hashlib处理大块数据时会释放GIL，多个线程可以同时计算
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hash_obj.update(mapped)
+            else:
+                hash_obj.update(f.read())
+        
+        return hash_obj.hexdigest()
+    
+    @staticmethod
+    def verify_files(entries, max_workers=None):
+        """
+        使用线程池并行校验多个文件
+        
+        Args:
+            entries (Iterable[Tuple[str, str, str]]): 校验项列表，每项为(file_path, algorithm, expected)
+            max_workers (int): 最大线程数，默认为CPU核心数的两倍
+            
+        Returns:
+            dict: 校验报告，包含valid、missing、mismatch、errors四个路径列表，
+                  以及hashes（路径到实际哈希值的映射）
+        """
+        report = {
+            "valid": [],
+            "missing": [],
+            "mismatch": [],
+            "errors": [],
+            "hashes": {}
+        }
+        
+        def check(entry):
+            file_path, algorithm, _ = entry
+            try:
+                return entry, Utils._hash_file(file_path, algorithm), None
+            except FileNotFoundError:
+                return entry, None, None
+            except Exception as e:
+                return entry, None, str(e)
+        
+        workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for (file_path, _, expected), digest, error in executor.map(check, entries):
+                if error:
+                    report["errors"].append(file_path)
+                elif digest is None:
+                    report["missing"].append(file_path)
+                else:
+                    report["hashes"][file_path] = digest
+                    if expected and digest != expected.lower():
+                        report["mismatch"].append(file_path)
+                    else:
+                        report["valid"].append(file_path)
+        
+        return report
+    
     @staticmethod
     def format_size(size_bytes):
         """
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+from ..utils.utils import Utils
+from ..utils.logger import logger
+
+class FileVerifyCache:
+    """
+    文件校验缓存，记录已校验文件的路径、大小、修改时间和sha1
+    
+    文件的大小和修改时间自上次校验后没有变化时，直接信任记录的sha1，
+    避免每次完整性检查都重新计算数千个库文件和资源文件的哈希。
+    """
+    
+    # 累计多少条记录后提交一次事务
+    COMMIT_INTERVAL = 200
+    
+    def __init__(self, db_path: str):
+        """
+        初始化文件校验缓存
+        
+        Args:
+            db_path (str): SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        self._conn = None
+        self._pending = 0
+        self._lock = threading.RLock()
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        获取数据库连接，首次使用时创建数据库
+        
+        Returns:
+            sqlite3.Connection: 数据库连接
+        """
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS verified_files ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, sha1 TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def lookup(self, file_path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """
+        查询文件的已校验sha1
+        
+        Args:
+            file_path (str): 文件路径
+            size (int): 当前文件大小
+            mtime_ns (int): 当前文件修改时间（纳秒）
+        
+        Returns:
+            Optional[str]: 记录的sha1，文件已变化或没有记录时返回None
+        """
+        with self._lock:
+            try:
+                row = self._get_connection().execute(
+                    "SELECT size, mtime_ns, sha1 FROM verified_files WHERE path = ?",
+                    (os.path.abspath(file_path),)
+                ).fetchone()
+            except Exception as e:
+                logger.warning(f"读取文件校验缓存失败: {str(e)}")
+                return None
+        
+        if row and row[0] == size and row[1] == mtime_ns:
+            return row[2]
+        return None
+    
+    def record(self, file_path: str, size: int, mtime_ns: int, sha1: str):
+        """
+        记录文件的sha1
+        
+        Args:
+            file_path (str): 文件路径
+            size (int): 文件大小
+            mtime_ns (int): 文件修改时间（纳秒）
+            sha1 (str): 文件sha1
+        """
+        with self._lock:
+            try:
+                self._get_connection().execute(
+                    "INSERT OR REPLACE INTO verified_files (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+                    (os.path.abspath(file_path), size, mtime_ns, sha1)
+                )
+                self._pending += 1
+                if self._pending >= self.COMMIT_INTERVAL:
+                    self.flush()
+            except Exception as e:
+                logger.warning(f"写入文件校验缓存失败: {str(e)}")
+    
+    def record_file(self, file_path: str, sha1: str):
+        """
+        记录刚写入的文件的sha1，例如下载时已边写入边计算了哈希
+        
+        Args:
+            file_path (str): 文件路径
+            sha1 (str): 文件sha1
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        self.record(file_path, stat.st_size, stat.st_mtime_ns, sha1)
+    
+    def flush(self):
+        """
+        提交尚未写入磁盘的记录
+        """
+        with self._lock:
+            if self._conn is not None and self._pending:
+                self._conn.commit()
+                self._pending = 0
+    
+    def verify_file(self, file_path: str, expected_size: int = 0, expected_sha1: str = "",
+                    deep: bool = False) -> bool:
+        """
+        校验文件是否完整，文件未变化时使用缓存的sha1
+        
+        Args:
+            file_path (str): 文件路径
+            expected_size (int): 预期文件大小，为0时不比较
+            expected_sha1 (str): 预期sha1，为空时不计算哈希
+            deep (bool): 是否忽略缓存，强制重新计算哈希
+        
+        Returns:
+            bool: 文件是否存在且完整
+        """
+        return self.verify_files([(file_path, expected_size, expected_sha1)], deep)[0]
+    
+    def verify_files(self, entries: List[Tuple[str, int, str]], deep: bool = False) -> List[bool]:
+        """
+        批量校验文件，缓存未命中的文件在线程池中并行计算哈希
+        
+        Args:
+            entries (List[Tuple[str, int, str]]): 校验项列表，每项为(file_path, expected_size, expected_sha1)
+            deep (bool): 是否忽略缓存，强制重新计算哈希
+        
+        Returns:
+            List[bool]: 与校验项一一对应的校验结果
+        """
+        results = [False] * len(entries)
+        to_hash = []
+        
+        for index, (file_path, expected_size, expected_sha1) in enumerate(entries):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            
+            if expected_size and stat.st_size != expected_size:
+                continue
+            
+            if not expected_sha1:
+                results[index] = True
+                continue
+            
+            expected_sha1 = expected_sha1.lower()
+            if not deep and self.lookup(file_path, stat.st_size, stat.st_mtime_ns) == expected_sha1:
+                results[index] = True
+                continue
+            
+            to_hash.append((index, file_path, expected_sha1, stat))
+        
+        if to_hash:
+            report = Utils.verify_files((file_path, 'sha1', sha1) for _, file_path, sha1, _ in to_hash)
+            for index, file_path, expected_sha1, stat in to_hash:
+                sha1 = report["hashes"].get(file_path)
+                if sha1 is None:
+                    continue
+                self.record(file_path, stat.st_size, stat.st_mtime_ns, sha1)
+                results[index] = sha1 == expected_sha1
+        
+        return results